@@ -2,50 +2,67 @@
 Configure OpenAI Prompt ID settings in the database.
 """
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from settings_manager import SettingsManager, init_settings_table
+from sqlalchemy import select
+from db_factory import make_engine
+from settings_manager import ChatSettings, init_settings_table
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fiat_clarity.db")
 
+PROMPT_ID = "pmpt_6962e013d6d88196b1c3834baa00e88500912c21d3085185"
+PROMPT_VERSION = "20"
+
+PROMPT_SETTINGS = [
+    {
+        "setting_key": "openai_prompt_id",
+        "setting_value": PROMPT_ID,
+        "setting_type": "string",
+        "description": "OpenAI Prompt ID for using custom prompts",
+    },
+    {
+        "setting_key": "openai_prompt_version",
+        "setting_value": PROMPT_VERSION,
+        "setting_type": "string",
+        "description": "OpenAI Prompt version",
+    },
+]
+
 # Initialize settings table if needed
 init_settings_table(DATABASE_URL)
 
-# Create database session
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-db = SessionLocal()
-
-try:
-    settings_mgr = SettingsManager(db)
+# Plain Core engine — two rows don't need an ORM unit-of-work
+engine = make_engine(DATABASE_URL, one_shot=True)
 
-    # Configure the OpenAI Prompt ID
-    settings_mgr.set_setting(
-        "openai_prompt_id",
-        "pmpt_6962e013d6d88196b1c3834baa00e88500912c21d3085185",
-        "string",
-        "OpenAI Prompt ID for using custom prompts"
-    )
+# Pick the dialect-specific upsert so both keys go in one statement
+if engine.dialect.name == "postgresql":
+    from sqlalchemy.dialects.postgresql import insert
+else:
+    from sqlalchemy.dialects.sqlite import insert
 
-    # Configure the prompt version
-    settings_mgr.set_setting(
-        "openai_prompt_version",
-        "20",
-        "string",
-        "OpenAI Prompt version"
+with engine.begin() as conn:
+    # Single bulk upsert in one transaction instead of two SELECT+INSERT/UPDATE cycles
+    stmt = insert(ChatSettings).values(PROMPT_SETTINGS)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["setting_key"],
+        set_={
+            "setting_value": stmt.excluded.setting_value,
+            "setting_type": stmt.excluded.setting_type,
+            "description": stmt.excluded.description,
+        },
     )
+    conn.execute(stmt)
 
     print("✓ OpenAI Prompt ID configured successfully!")
-    print(f"  Prompt ID: pmpt_6962e013d6d88196b1c3834baa00e88500912c21d3085185")
-    print(f"  Prompt Version: 20")
-
-    # Verify settings
-    prompt_id = settings_mgr.get_setting("openai_prompt_id")
-    prompt_version = settings_mgr.get_setting("openai_prompt_version")
-    print(f"\n✓ Verified settings:")
-    print(f"  openai_prompt_id: {prompt_id}")
-    print(f"  openai_prompt_version: {prompt_version}")
-
-finally:
-    db.close()
+    print(f"  Prompt ID: {PROMPT_ID}")
+    print(f"  Prompt Version: {PROMPT_VERSION}")
+
+    # Verify both settings with a single SELECT ... WHERE key IN (...)
+    verified = conn.execute(
+        select(ChatSettings.setting_key, ChatSettings.setting_value).where(
+            ChatSettings.setting_key.in_(["openai_prompt_id", "openai_prompt_version"])
+        )
+    ).all()
+
+print(f"\n✓ Verified settings:")
+for key, value in verified:
+    print(f"  {key}: {value}")
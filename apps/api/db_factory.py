@@ -0,0 +1,120 @@
+"""
+Shared SQLAlchemy engine factory and DDL helpers.
+
+Centralizes the dialect-dependent engine configuration (SQLite
+check_same_thread, psycopg2 executemany batching, script pooling) that
+was previously duplicated as `"sqlite" in DATABASE_URL` substring checks
+across the init scripts, plus the FK-layered parallel drop/create used
+by the reset paths.
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool
+
+
+def make_engine(url: str, one_shot: bool = False, connect_args: dict = None) -> Engine:
+    """Build an engine configured for the URL's backend.
+
+    Set one_shot=True for init/config scripts that use a single
+    connection and exit — they skip the QueuePool entirely. Extra DBAPI
+    connect options (connect_timeout, application_name, ...) can be
+    passed via connect_args.
+    """
+    backend = make_url(url).get_backend_name()
+
+    # Larger SQL compilation cache (default 500): the app re-executes the
+    # same Core/ORM statements constantly, so keep them all compiled.
+    kwargs = {"query_cache_size": 1200, "insertmanyvalues_page_size": 1000}
+    connect_args = dict(connect_args or {})
+
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+        # SQLite's DBAPI doesn't understand the Postgres-style options
+        connect_args.pop("connect_timeout", None)
+        connect_args.pop("application_name", None)
+    elif backend == "postgresql":
+        # psycopg2 batched executemany: page multi-row INSERTs into a few
+        # round-trips instead of one per row.
+        kwargs.update(
+            executemany_mode="values_plus_batch",
+            executemany_values_page_size=1000,
+            executemany_batch_page_size=500,
+        )
+
+    if one_shot:
+        kwargs["poolclass"] = NullPool
+
+    return create_engine(url, connect_args=connect_args, **kwargs)
+
+
+def topological_layers(metadata):
+    """Group tables into FK-dependency layers; tables within a layer are independent."""
+    remaining = dict(metadata.tables)
+    created = set()
+    layers = []
+
+    while remaining:
+        layer = [
+            table for table in remaining.values()
+            if all(
+                fk.column.table.name in created or fk.column.table.name == table.name
+                for fk in table.foreign_keys
+            )
+        ]
+        if not layer:
+            # Cyclic FKs — fall back to whatever is left in sorted order
+            layer = list(remaining.values())
+        layers.append(layer)
+        for table in layer:
+            created.add(table.name)
+            del remaining[table.name]
+
+    return layers
+
+
+def create_tables_parallel(engine: Engine, metadata, max_workers: int = 8):
+    """Issue CREATE TABLEs layer by layer, dispatching independent tables concurrently.
+
+    2N serial round-trips collapse to ~depth(FK DAG) waves; each layer
+    finishes (and commits) before its dependents start, so FK references
+    always resolve.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    def create_one(table):
+        ddl = str(CreateTable(table).compile(dialect=engine.dialect))
+        with engine.connect() as conn:
+            conn.exec_driver_sql(ddl)
+            # CREATE TABLE does not carry the secondary indexes (index=True
+            # columns and __table_args__ entries) — emit them here too
+            for index in table.indexes:
+                conn.exec_driver_sql(
+                    str(CreateIndex(index).compile(dialect=engine.dialect))
+                )
+            conn.commit()
+        return table.name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for layer in topological_layers(metadata):
+            for name in executor.map(create_one, layer):
+                print(f"  ✓ created {name}")
+
+
+def drop_tables_parallel(engine: Engine, metadata, max_workers: int = 8):
+    """Issue DROP TABLEs in reverse FK order, independent tables concurrently."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def drop_one(table):
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{table.name}" CASCADE'
+                                 if engine.dialect.name == "postgresql"
+                                 else f'DROP TABLE IF EXISTS "{table.name}"')
+            conn.commit()
+        return table.name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for layer in reversed(topological_layers(metadata)):
+            for name in executor.map(drop_one, layer):
+                print(f"  ✓ dropped {name}")
@@ -4,11 +4,9 @@ Run this manually if preDeployCommand doesn't work.
 """
 import os
 import sys
-from sqlalchemy import create_engine, text
-from models import Base
-from settings_manager import ChatSettings, init_settings_table
 
-# Get database URL from environment or command line
+# Get database URL from environment or command line. Validate before the
+# heavy SQLAlchemy/models imports so a bad invocation fails instantly.
 DATABASE_URL = os.getenv("DATABASE_URL")
 if len(sys.argv) > 1:
     DATABASE_URL = sys.argv[1]
@@ -18,43 +16,67 @@ if not DATABASE_URL:
     print("Usage: python force_reset_db.py <DATABASE_URL>")
     sys.exit(1)
 
-print(f"Connecting to database...")
-engine = create_engine(DATABASE_URL)
-
-try:
-    # Drop ALL tables
-    print("🔥 DROPPING ALL TABLES...")
-    Base.metadata.drop_all(bind=engine)
-    print("✅ All tables dropped")
-
-    # Recreate all tables with new schema
-    print("🔨 Creating tables with new schema...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ All tables created with extra_data columns")
-
-    # Initialize settings table
-    print("🔨 Initializing settings table...")
-    init_settings_table(DATABASE_URL)
-    print("✅ Settings table initialized")
-
-    # Enable pgvector and configure embedding column
-    with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        conn.commit()
-        print("✅ pgvector extension enabled")
-
-        # Alter chunks table
-        try:
-            conn.execute(text("ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(1536) USING embedding::vector"))
-            conn.commit()
-            print("✅ Chunks.embedding configured as vector(1536)")
-        except Exception as e:
-            if "does not exist" not in str(e):
-                print(f"⚠️  Chunks table alteration: {e}")
-
-    print("\n✅✅✅ DATABASE RESET COMPLETE! ✅✅✅")
-    print("The application should now work correctly.")
-
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-    sys.exit(1)
+
+def main():
+    # Deferred imports: SQLAlchemy + models cost hundreds of ms on cold
+    # boot and aren't needed until the URL guard above has passed.
+    from sqlalchemy import inspect
+    from db_factory import make_engine, create_tables_parallel, drop_tables_parallel
+    from models import Base
+    from settings_manager import init_settings_table
+
+    print(f"Connecting to database...")
+    engine = make_engine(DATABASE_URL, one_shot=True)
+
+    try:
+        # chunks now declares a typed vector column, so the extension has
+        # to exist before any CREATE TABLE runs
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS vector")
+
+        # Drop ALL tables, FK-independent tables in parallel (reverse layers)
+        print("🔥 DROPPING ALL TABLES...")
+        drop_tables_parallel(engine, Base.metadata)
+        print("✅ All tables dropped")
+
+        # Recreate all tables with new schema, FK-independent tables in parallel
+        print("🔨 Creating tables with new schema...")
+        create_tables_parallel(engine, Base.metadata)
+        print("✅ All tables created with extra_data columns")
+
+        # Initialize settings table
+        print("🔨 Initializing settings table...")
+        init_settings_table(DATABASE_URL)
+        print("✅ Settings table initialized")
+
+        # Enable pgvector and configure embedding column in one transaction —
+        # one commit/WAL sync instead of one per statement.
+        # halfvec (FP16, pgvector >= 0.7) halves embedding storage and memory
+        # bandwidth during similarity scans; fall back to vector on older installs.
+        has_chunks = inspect(engine).has_table("chunks")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS vector")
+            print("✅ pgvector extension enabled")
+
+            version = conn.exec_driver_sql("SELECT extversion FROM pg_extension WHERE extname = 'vector'").scalar() or "0"
+            embed_type = "halfvec" if tuple(int(part) for part in version.split(".")[:2]) >= (0, 7) else "vector"
+
+            # Alter chunks table (pre-checked above so a missing table can't
+            # poison the shared transaction)
+            if has_chunks:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE chunks ALTER COLUMN embedding TYPE {embed_type}(1536) "
+                    f"USING embedding::{embed_type}"
+                )
+                print(f"✅ Chunks.embedding configured as {embed_type}(1536)")
+
+        print("\n✅✅✅ DATABASE RESET COMPLETE! ✅✅✅")
+        print("The application should now work correctly.")
+
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 Database initialization script for SQLite (no Docker needed).
 """
 import os
-from sqlalchemy import create_engine
-from models_sqlite import Base
+from sqlalchemy import inspect
+from db_factory import make_engine
+from models import Base
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,17 +12,122 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fiat_clarity.db")
 
 def init_database():
-    """Initialize SQLite database and create all tables."""
+    """Initialize SQLite database and create any missing tables."""
     print("Initializing SQLite database...")
-    engine = create_engine(DATABASE_URL)
+    engine = make_engine(DATABASE_URL, one_shot=True)
 
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print("✓ All tables created")
+    # Performance pragmas: WAL + synchronous=NORMAL cut fsyncs per commit,
+    # temp_store/mmap keep scratch and page reads in memory. journal_mode
+    # is persistent, so later app connections benefit too.
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+        conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+        conn.exec_driver_sql("PRAGMA mmap_size=268435456")
+
+    # Create only what's missing — one sqlite_master read instead of a
+    # per-table existence probe on every run
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for name, table in Base.metadata.tables.items() if name not in existing]
+
+    if missing:
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+        print(f"✓ Created {len(missing)} missing table(s)")
+    else:
+        print("✓ Schema already up to date, skipping table creation")
+
+    _init_vec_table(engine)
+    _init_fts_table(engine)
 
     print("\n✅ Database initialization complete!")
     print(f"   Database: {DATABASE_URL}")
-    print("   Note: Using SQLite (keyword search only, no vector embeddings)")
+
+
+def _init_fts_table(engine):
+    """Create the FTS5 index over chunk content and keep it synced.
+
+    Replaces the leading-%% LIKE scan in keyword search with an indexed
+    bm25-ranked match. FTS5 ships with stock SQLite, but guard anyway.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5("
+                "content, content='chunks', content_rowid='id', "
+                "tokenize='porter unicode61')"
+            )
+            conn.exec_driver_sql(
+                "CREATE TRIGGER IF NOT EXISTS chunks_fts_ai AFTER INSERT ON chunks BEGIN "
+                "INSERT INTO chunks_fts(rowid, content) VALUES (new.id, new.content); "
+                "END"
+            )
+            conn.exec_driver_sql(
+                "CREATE TRIGGER IF NOT EXISTS chunks_fts_ad AFTER DELETE ON chunks BEGIN "
+                "INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+                "END"
+            )
+            conn.exec_driver_sql(
+                "CREATE TRIGGER IF NOT EXISTS chunks_fts_au AFTER UPDATE OF content ON chunks BEGIN "
+                "INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+                "INSERT INTO chunks_fts(rowid, content) VALUES (new.id, new.content); "
+                "END"
+            )
+            conn.commit()
+        print("✓ FTS5 keyword index ready (chunks_fts)")
+    except Exception as e:
+        print(f"⚠ FTS5 setup warning: {e}")
+
+
+def _init_vec_table(engine):
+    """Create the sqlite-vec KNN table and keep it synced with chunks.
+
+    Optional: when the sqlite-vec extension isn't installed the app
+    simply keeps using keyword search, same as before.
+    """
+    try:
+        import sqlite_vec
+    except ImportError:
+        print("   Note: sqlite-vec not installed (keyword search only, no vector embeddings)")
+        return
+
+    raw = engine.raw_connection()
+    try:
+        raw.enable_load_extension(True)
+        sqlite_vec.load(raw)
+        raw.enable_load_extension(False)
+
+        cursor = raw.cursor()
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS vec_chunks USING vec0("
+            "chunk_id INTEGER PRIMARY KEY, "
+            "embedding FLOAT[1536] distance_metric=cosine)"
+        )
+        # Triggers keep vec_chunks in lockstep with chunks, so ingest code
+        # never has to know the KNN table exists
+        cursor.execute(
+            "CREATE TRIGGER IF NOT EXISTS chunks_vec_ai AFTER INSERT ON chunks "
+            "WHEN new.embedding IS NOT NULL BEGIN "
+            "INSERT INTO vec_chunks(chunk_id, embedding) VALUES (new.id, new.embedding); "
+            "END"
+        )
+        cursor.execute(
+            "CREATE TRIGGER IF NOT EXISTS chunks_vec_ad AFTER DELETE ON chunks BEGIN "
+            "DELETE FROM vec_chunks WHERE chunk_id = old.id; "
+            "END"
+        )
+        cursor.execute(
+            "CREATE TRIGGER IF NOT EXISTS chunks_vec_au AFTER UPDATE OF embedding ON chunks BEGIN "
+            "DELETE FROM vec_chunks WHERE chunk_id = old.id; "
+            "INSERT INTO vec_chunks(chunk_id, embedding) "
+            "SELECT new.id, new.embedding WHERE new.embedding IS NOT NULL; "
+            "END"
+        )
+        raw.commit()
+        print("✓ sqlite-vec KNN table ready (vec_chunks)")
+    except Exception as e:
+        print(f"⚠ sqlite-vec setup warning: {e}")
+    finally:
+        raw.close()
 
 if __name__ == "__main__":
     init_database()
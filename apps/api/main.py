@@ -5,30 +5,49 @@ Updated: 2026-01-14 - Using OpenAI Prompts API with Clarity Storage
 """
 from fastapi import FastAPI, HTTPException, Depends, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from datetime import datetime
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import sessionmaker, Session, selectinload
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import asyncio
+import io
 import os
+import sys
+import time
 import uuid
 import base64
+import gzip
+import hashlib
 import json
+import logging
+import re
+
+import numpy as np
+import orjson
 
 from dotenv import load_dotenv
 
-# Import PostgreSQL models (for production)
+# Lazy %s-style logging so disabled levels skip string formatting (and
+# the stdout lock) entirely on the request path
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("clarity")
+
+# Dialect-aware models: pgvector/jsonb on Postgres, TEXT variants on SQLite
 from models import (
     Base, Conversation, Message, Lead, ConsentEvent,
     Document, Chunk, DocumentStatus
 )
-print("Using PostgreSQL models")
 
 from services.ai_provider import ai_provider
 from services.assistants_provider import assistants_provider
-from services.rag_service import RAGService
+from services.rag_service import RAGService, RagChunk
 from services.routing_service import RoutingService
 from services.web_scraper import web_scraper
 from settings_manager import SettingsManager, init_settings_table
@@ -37,20 +56,396 @@ load_dotenv()
 
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fiat_clarity.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+if "sqlite" in DATABASE_URL:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    try:
+        # Optional: sqlite-vec gives SQLite an indexed KNN virtual table
+        # (vec_chunks); without it the RAG path falls back to keyword
+        # search exactly as before
+        import sqlite3
+        import sqlite_vec
+        from sqlalchemy import event
+
+        # Some CPython builds ship sqlite3 without loadable-extension
+        # support; registering the listener there would fail every
+        # connection checkout, so probe once and skip instead
+        if not hasattr(sqlite3.Connection, "enable_load_extension"):
+            raise ImportError("sqlite3 built without extension loading")
+
+        @event.listens_for(engine, "connect")
+        def _load_sqlite_vec(dbapi_conn, _record):
+            try:
+                dbapi_conn.enable_load_extension(True)
+                sqlite_vec.load(dbapi_conn)
+                dbapi_conn.enable_load_extension(False)
+            except Exception as e:
+                logger.warning(f"sqlite-vec load failed; continuing without it: {e}")
+    except ImportError as e:
+        logger.info(f"sqlite-vec unavailable; SQLite vector search disabled ({e})")
+else:
+    # Sized, pre-pinged pool: bursts of /chat traffic reuse warm TCP+TLS
+    # connections instead of starving on the default 5-slot pool; pre-ping
+    # silently discards sockets killed by idle timeouts. For horizontal
+    # scaling beyond one box, front with PgBouncer in transaction-pooling
+    # mode (port 6432) and shrink pool_size accordingly.
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        # LIFO checkout keeps a small hot set of connections busy and
+        # lets the rest idle long enough for pool_recycle to reap them
+        pool_use_lifo=True,
+        # Page bulk INSERTs (document chunks) into 1000-row statements
+        insertmanyvalues_page_size=1000,
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Shared pool for overlapping independent retrieval I/O (website fetch
+# vs vector search) inside a single request
+_retrieval_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval")
+
+
+@lru_cache(maxsize=8)
+def get_openai_client(api_key: str):
+    """One OpenAI client per API key — reuses its httpx connection pool
+    and TLS session instead of re-handshaking every request."""
+    from openai import OpenAI
+    from services.openai_http import pooled_http_client
+    return OpenAI(api_key=api_key, http_client=pooled_http_client())
+
+
+@lru_cache(maxsize=8)
+def get_async_openai_client(api_key: str):
+    """Async sibling of get_openai_client for the streaming path."""
+    from openai import AsyncOpenAI
+    from services.openai_http import pooled_http_client
+    return AsyncOpenAI(api_key=api_key, http_client=pooled_http_client(asynchronous=True))
+
+
+def sse(event: str, **fields) -> bytes:
+    """Encode one SSE data frame as bytes via orjson — no per-delta
+    stdlib json.dumps + str formatting on the hot streaming path."""
+    return b"data: " + orjson.dumps({"type": event, **fields}) + b"\n\n"
+
+
+DONE_FRAME = b'data: {"type":"done"}\n\n'
+
+# Hot-loop constants for the per-token stream path: interned event types
+# let the dispatch hit pointer equality first, and the pre-split frame
+# leaves orjson-encoding the bare content string as the only per-token work
+EVENT_DELTA = sys.intern("response.output_text.delta")
+EVENT_TEXT_DONE = sys.intern("response.output_text.done")
+CONTENT_PREFIX = b'data: {"type":"content","content":'
+CONTENT_SUFFIX = b'}\n\n'
+
+# "Related Resources" citation parsing — compiled once at import so the
+# per-response parse skips re's pattern-cache dispatch entirely
+_RESOURCES_RE = re.compile(r'Related Resources?:?\s*\n((?:[-•]\s*.*\n?)+)', re.IGNORECASE)
+_LINE_RE = re.compile(r'[-•]\s*([^\n]+)')
+# One combined pattern per bullet line: title and optional URL captured
+# together, so each line is walked once instead of a search + sub chain
+_LINE_PARTS = re.compile(r'^[-•\s]*(?P<title>.*?)(?:[\s:\(\[]+(?P<url>https?://[^\s\)\]]+))?[\s\)\]:]*$')
+
+
+class _CitationScanner:
+    """Watch the token stream for a "Related Resources" section.
+
+    Buffers only text from the sentinel onward, so citation parsing at
+    stream end walks just the resources block instead of re-running
+    _RESOURCES_RE over the entire assistant message.
+    """
+
+    _SENTINEL = "related resources"
+
+    __slots__ = ("_tail", "_parts")
+
+    def __init__(self):
+        self._tail = ""
+        self._parts = []
+
+    def feed(self, content):
+        if self._parts:
+            self._parts.append(content)
+            return
+        self._tail += content
+        idx = self._tail.lower().find(self._SENTINEL)
+        if idx != -1:
+            self._parts.append(self._tail[idx:])
+            self._tail = ""
+        else:
+            # Keep just enough tail to catch a sentinel split across deltas
+            self._tail = self._tail[-(len(self._SENTINEL) - 1):]
+
+    def resources(self):
+        """Parse the buffered section into citation dicts."""
+        if not self._parts:
+            return []
+        section = _RESOURCES_RE.match("".join(self._parts))
+        if not section:
+            return []
+
+        resources = []
+        # Single pass over the block: each bullet line is parsed once by
+        # the combined title/URL pattern
+        # Matches: "- Title: URL" or "- Title" or "• Title (URL)"
+        for line_match in _LINE_RE.finditer(section.group(1)):
+            parts = _LINE_PARTS.match(line_match.group(1))
+            if not parts:
+                continue
+
+            title = parts.group('title').strip('- •:').strip()
+            if title:
+                resources.append({
+                    "title": title,
+                    "url": parts.group('url'),
+                    "date": None
+                })
+        return resources
+
+
+class _ContentBatcher:
+    """Coalesce per-token content deltas into fewer SSE frames.
+
+    OpenAI deltas are often 1-4 characters, so a frame per delta means
+    hundreds of JSON encodes, ASGI sends, and TCP writes per response.
+    Buffer deltas until ~``size`` bytes accumulate or ``timeout`` seconds
+    pass since the last flush, then emit one combined content frame —
+    imperceptible added latency for an order of magnitude fewer frames.
+    """
+
+    __slots__ = ("size", "timeout", "_parts", "_len", "_last_flush")
+
+    def __init__(self, size: int = 64, timeout: float = 0.02):
+        self.size = size
+        self.timeout = timeout
+        self._parts = []
+        self._len = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, content):
+        """Buffer a delta; return a frame to yield if the window closed."""
+        self._parts.append(content)
+        self._len += len(content)
+        if self._len >= self.size or time.monotonic() - self._last_flush >= self.timeout:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Drain the buffer into one content frame, or None if empty."""
+        self._last_flush = time.monotonic()
+        if not self._parts:
+            return None
+        frame = CONTENT_PREFIX + orjson.dumps("".join(self._parts)) + CONTENT_SUFFIX
+        self._parts.clear()
+        self._len = 0
+        return frame
+
+
+async def _empty_list():
+    """Placeholder awaitable for gather() when a retrieval leg is disabled."""
+    return []
+
+
+_STREAM_END = object()
+
+
+async def iter_buffered(stream, buffer: int = 4):
+    """Buffer a stream iterator (sync or async) behind a prefetch queue.
+
+    A pump task pulls upstream events (on worker threads for sync
+    iterators) while the SSE generator drains the queue, so the OpenAI
+    recv and the client write overlap instead of strictly alternating.
+    maxsize bounds prefetch so a slow client doesn't buffer the whole
+    completion in memory.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    async def pump():
+        try:
+            if hasattr(stream, "__aiter__"):
+                async for item in stream:
+                    await queue.put(item)
+            else:
+                iterator = iter(stream)
+                while True:
+                    item = await asyncio.to_thread(next, iterator, _STREAM_END)
+                    if item is _STREAM_END:
+                        break
+                    await queue.put(item)
+            await queue.put(_STREAM_END)
+        except BaseException as e:
+            await queue.put(e)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+        await task
+    finally:
+        task.cancel()
+
+
+def _dedup_context(web_content, context_chunks):
+    """Drop duplicate sources before they reach the prompt.
+
+    The same article often shows up both scraped from the site and
+    RAG-indexed; a duplicate pays double in prefill tokens. Keyed by
+    source_url, falling back to a hash of the content head, keeping the
+    earlier (higher-ranked) copy.
+    """
+    seen = set()
+    unique = []
+    for chunk in web_content + context_chunks:
+        key = chunk.source_url or hashlib.blake2b(
+            chunk.content[:200].encode(), digest_size=8
+        ).digest()
+        if key not in seen:
+            seen.add(key)
+            unique.append(chunk)
+    return unique
+
+
+def _build_context(all_context):
+    """Single pass over retrieval results: write the prompt context into
+    one linear buffer and collect citation entries as we go, instead of
+    f-string intermediates plus a second scan for citations."""
+    buf = io.StringIO()
+    citations = []
+    for i, chunk in enumerate(all_context):
+        if i:
+            buf.write("\n\n")
+        title = chunk.title
+        buf.write("[")
+        buf.write(title or "Unknown")
+        buf.write("]\n")
+        buf.write(chunk.content)
+        if title:
+            citations.append({
+                "title": title,
+                "date": chunk.published_date,
+                "url": chunk.source_url,
+            })
+    return buf.getvalue(), citations
+
+
+class ProximityCache:
+    """Approximate semantic LRU keyed by query embedding.
+
+    Conversational traffic asks near-identical questions constantly; a
+    cosine-distance match within `threshold` of a cached query reuses its
+    retrieval results and skips the vector search + site fetch entirely.
+    Entries are normalized vectors, so similarity is a single matrix-vector
+    product over at most `capacity` rows.
+    """
+
+    def __init__(self, capacity: int = 1024, threshold: float = 0.05):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._entries = OrderedDict()  # id -> (normalized vector, value)
+        self._lock = Lock()
+        self._next_id = 0
+
+    @staticmethod
+    def _normalize(vector):
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def get(self, vector):
+        if vector is None:
+            return None
+        q = self._normalize(vector)
+        with self._lock:
+            if not self._entries:
+                return None
+            keys = list(self._entries.keys())
+            matrix = np.stack([self._entries[k][0] for k in keys])
+            sims = matrix @ q
+            best = int(sims.argmax())
+            if 1.0 - float(sims[best]) <= self.threshold:
+                key = keys[best]
+                self._entries.move_to_end(key)
+                return self._entries[key][1]
+            return None
+
+    def put(self, vector, value):
+        if vector is None:
+            return
+        with self._lock:
+            if len(self._entries) >= self.capacity:
+                self._entries.popitem(last=False)
+            self._entries[self._next_id] = (self._normalize(vector), value)
+            self._next_id += 1
+
+
+# Process-global so hits survive across requests (per worker)
+_retrieval_cache = ProximityCache()
+
+
+class SettingsCache:
+    """Process-global settings snapshot with a short TTL.
+
+    Settings change rarely but every chat turn used to open a dedicated
+    session and issue ~10 point SELECTs for them. One bulk reload per TTL
+    window serves all requests; admin writes call invalidate() so changes
+    still land immediately.
+    """
+
+    TTL = 30.0
+
+    def __init__(self):
+        self._data = {}
+        self._expires = 0.0
+        self._lock = Lock()
+
+    def get(self, key: str, default=None):
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._expires:
+                self._reload()
+                self._expires = now + self.TTL
+            return self._data.get(key, default)
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+
+    def _reload(self):
+        db = SessionLocal()
+        try:
+            # get_all_settings merges DEFAULT_SETTINGS under the DB values,
+            # so missing keys resolve exactly as the old per-key path did
+            all_settings = SettingsManager(db).get_all_settings()
+            self._data = {key: cfg["value"] for key, cfg in all_settings.items()}
+        except Exception as e:
+            logger.warning("Settings cache reload error: %s", e)
+        finally:
+            db.close()
+
+
+settings_cache = SettingsCache()
+
 # Initialize settings table
 try:
     init_settings_table(DATABASE_URL)
 except Exception as e:
-    print(f"Settings initialization error: {e}")
+    logger.warning("Settings initialization error: %s", e)
 
 # FastAPI app
 app = FastAPI(
     title="Fiat Clarity Chat API",
     description="AI-powered conversational interface for retirement planning",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson for every JSON response — skips jsonable_encoder's slow path
+    default_response_class=ORJSONResponse,
 )
 
 # CORS - Allow localhost for development and production URLs
@@ -65,6 +460,50 @@ FRONTEND_URL = os.getenv("FRONTEND_URL")
 if FRONTEND_URL and FRONTEND_URL not in ALLOWED_ORIGINS:
     ALLOWED_ORIGINS.append(FRONTEND_URL)
 
+class GzipRequestMiddleware:
+    """Inflate request bodies sent with Content-Encoding: gzip.
+
+    Starlette's GZipMiddleware only compresses responses; seeding
+    clients gzip large document uploads, so inbound bodies need the
+    matching decode before routing sees them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            if headers.get(b"content-encoding", b"").lower() == b"gzip":
+                chunks = []
+                while True:
+                    message = await receive()
+                    chunks.append(message.get("body", b""))
+                    if not message.get("more_body"):
+                        break
+                body = gzip.decompress(b"".join(chunks))
+
+                scope = dict(scope)
+                scope["headers"] = [
+                    (name, value) for name, value in scope["headers"]
+                    if name not in (b"content-encoding", b"content-length")
+                ] + [(b"content-length", str(len(body)).encode())]
+
+                replayed = False
+
+                async def replay():
+                    nonlocal replayed
+                    if not replayed:
+                        replayed = True
+                        return {"type": "http.request", "body": body, "more_body": False}
+                    return await receive()
+
+                await self.app(scope, replay, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(GzipRequestMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -77,11 +516,7 @@ app.add_middleware(
 # Custom validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print(f"\n=== VALIDATION ERROR ===")
-    print(f"URL: {request.url}")
-    print(f"Method: {request.method}")
-    print(f"Errors: {exc.errors()}")
-    print("========================\n")
+    logger.warning("Validation error on %s %s: %s", request.method, request.url, exc.errors())
     return JSONResponse(
         status_code=422,
         content={"detail": exc.errors()},
@@ -130,12 +565,17 @@ class LeadResponse(BaseModel):
     booking_url: str
 
 
+class BulkApproveRequest(BaseModel):
+    ids: List[int]
+
+
 class IngestRequest(BaseModel):
     title: str
     content: str
     source_url: Optional[str] = None
     source_type: Optional[str] = "markdown"
     published_date: Optional[str] = None
+    content_hash: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -177,25 +617,35 @@ TONE:
 Remember: Your goal is to educate and build trust, always nudging toward a human conversation."""
 
 
+# Health probes fire every few seconds from the platform; cache the DB
+# ping briefly so they don't each cost a round-trip
+_health_state = {"expires": 0.0, "database": "unknown"}
+_HEALTH_TTL = 5.0
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check(db: Session = Depends(get_db)):
-    """Health check endpoint."""
-    try:
-        # Test database connection
-        db.execute("SELECT 1")
-        db_status = "connected"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
-
-    return {
-        "status": "healthy" if db_status == "connected" else "degraded",
-        "dev_mode": ai_provider.dev_mode,
-        "database": db_status
-    }
+    """Health check endpoint (DB ping cached for a few seconds)."""
+    now = time.monotonic()
+    if now >= _health_state["expires"]:
+        try:
+            # Test database connection
+            db.execute(text("SELECT 1"))
+            _health_state["database"] = "connected"
+        except Exception as e:
+            _health_state["database"] = f"error: {str(e)}"
+        _health_state["expires"] = now + _HEALTH_TTL
+    db_status = _health_state["database"]
+
+    return HealthResponse.model_construct(
+        status="healthy" if db_status == "connected" else "degraded",
+        dev_mode=ai_provider.dev_mode,
+        database=db_status,
+    )
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(
+def chat(
     request: ChatRequest,
     http_request: Request,
     db: Session = Depends(get_db)
@@ -203,17 +653,19 @@ async def chat(
     """
     Handle chat message.
     Returns response and indicates if lead gate should be shown.
+
+    Declared sync on purpose: every DB call here is blocking SQLAlchemy,
+    so FastAPI runs the handler on its threadpool instead of pinning the
+    event loop for the whole round-trip.
     """
-    # Create separate session for settings
-    settings_db = SessionLocal()
     try:
-        # Load settings with separate session
-        settings_mgr = SettingsManager(settings_db)
-
-        # Get or create conversation
-        conversation = db.query(Conversation).filter(
-            Conversation.session_id == request.session_id
-        ).first()
+        # Get or create conversation; eager-load the lead so the booking
+        # URL on the return path doesn't cost another SELECT
+        conversation = db.execute(
+            select(Conversation)
+            .options(selectinload(Conversation.lead))
+            .where(Conversation.session_id == request.session_id)
+        ).scalar_one_or_none()
 
         if not conversation:
             conversation = Conversation(
@@ -221,31 +673,46 @@ async def chat(
                 extra_data=request.metadata
             )
             db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
+            # flush (not commit) just to get the id — it persists with the
+            # message writes below in a single transaction
+            db.flush()
 
-        # Save user message
+        # Build the user message but defer the INSERT: it commits together
+        # with the assistant/gate message at the end of the turn, saving a
+        # round-trip and a transaction boundary per request.
         user_message = Message(
             conversation_id=conversation.id,
             role="user",
             content=request.message,
             extra_data=request.metadata
         )
-        db.add(user_message)
-        db.commit()
+
+        # One query for both the recent history and the assistant-message
+        # count: the windowed count runs over the WHERE-matched set before
+        # LIMIT, so it sees the whole conversation.
+        history_rows = db.execute(
+            select(
+                Message.role,
+                Message.content,
+                func.count().filter(Message.role == "assistant").over().label("assistant_count"),
+            )
+            .where(
+                Message.conversation_id == conversation.id,
+                Message.role.in_(["user", "assistant"]),
+            )
+            .order_by(Message.created_at.desc())
+            .limit(5)
+        ).all()
 
         # Check if we should show lead gate
-        enable_lead_gate = settings_mgr.get_setting("enable_lead_gate", True)
-        assistant_message_count = db.query(Message).filter(
-            Message.conversation_id == conversation.id,
-            Message.role == "assistant"
-        ).count()
+        enable_lead_gate = settings_cache.get("enable_lead_gate", True)
+        assistant_message_count = history_rows[0].assistant_count if history_rows else 0
 
         show_lead_gate = enable_lead_gate and assistant_message_count >= 1 and not conversation.lead_id
 
         if show_lead_gate:
             # Get lead gate message from settings
-            lead_gate_msg = settings_mgr.get_setting(
+            lead_gate_msg = settings_cache.get(
                 "lead_gate_message",
                 "Before we keep going, where should we send your summary and how can we reach you?"
             )
@@ -256,10 +723,11 @@ async def chat(
                 content=lead_gate_msg,
                 extra_data={"type": "lead_gate"}
             )
-            db.add(gate_message)
+            db.add_all([user_message, gate_message])
             db.commit()
 
-            return ChatResponse(
+            # Server-produced values — skip Pydantic validation
+            return ChatResponse.model_construct(
                 response=gate_message.content,
                 session_id=request.session_id,
                 show_lead_gate=True,
@@ -267,51 +735,63 @@ async def chat(
             )
 
         # Normal response flow - retrieve relevant context
-        enable_rag = settings_mgr.get_setting("enable_rag", True)
-        rag_chunk_limit = int(settings_mgr.get_setting("rag_chunk_limit", 3))
+        enable_rag = settings_cache.get("enable_rag", True)
+        rag_chunk_limit = int(settings_cache.get("rag_chunk_limit", 3))
 
-        # First try to get content from fiatwm.com website
-        web_content = []
-        try:
-            scraped_pages = web_scraper.search_site(request.message)
-            web_content = [
-                {
-                    "title": page["title"],
-                    "content": page["content"][:1000],  # Limit content length
-                    "source_url": page["url"],
-                    "published_date": "Recent"
-                }
-                for page in scraped_pages
-            ]
-            if web_content:
-                print(f"✓ Found {len(web_content)} relevant pages from fiatwm.com")
-        except Exception as e:
-            print(f"⚠ Web scraping error: {e}")
+        # Semantic cache first: a near-duplicate of a recent question
+        # reuses its retrieval results outright
+        query_embedding = ai_provider.generate_embedding(request.message)
+        cached = _retrieval_cache.get(query_embedding)
 
-        # Then get context from RAG database
-        rag_service = RAGService(db)
-        context_chunks = rag_service.retrieve_relevant_chunks(request.message, limit=rag_chunk_limit) if enable_rag else []
+        if cached is not None:
+            web_content, context_chunks = cached
+        else:
+            # Overlap the two independent retrieval backends: the fiatwm.com
+            # fetch runs on the shared pool while RAG queries the database on
+            # this thread, so the stage costs max(t_web, t_rag), not the sum.
+            web_future = _retrieval_pool.submit(web_scraper.search_site, request.message)
 
-        # Combine web content and RAG chunks
-        all_context = web_content + context_chunks
+            rag_service = RAGService(db)
+            context_chunks = rag_service.retrieve_relevant_chunks(request.message, limit=rag_chunk_limit) if enable_rag else []
 
-        # Build message history for context
-        recent_messages = db.query(Message).filter(
-            Message.conversation_id == conversation.id,
-            Message.role.in_(["user", "assistant"])
-        ).order_by(Message.created_at.desc()).limit(6).all()
+            web_content = []
+            try:
+                scraped_pages = web_future.result()
+                web_content = [
+                    RagChunk(
+                        title=page["title"],
+                        content=page["content"][:1000],  # Limit content length
+                        source_url=page["url"],
+                        published_date="Recent",
+                    )
+                    for page in scraped_pages
+                ]
+                if web_content:
+                    logger.debug("Found %d relevant pages from fiatwm.com", len(web_content))
+            except Exception as e:
+                logger.warning("Web scraping error: %s", e)
+
+            _retrieval_cache.put(query_embedding, (web_content, context_chunks))
 
+        # Combine web content and RAG chunks
+        all_context = _dedup_context(web_content, context_chunks)
+
+        # Build message history for context from the rows already fetched,
+        # appending the current (not-yet-inserted) user message
         message_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in reversed(recent_messages)
+            {"role": row.role, "content": row.content}
+            for row in reversed(history_rows)
         ]
+        message_history.append({"role": "user", "content": request.message})
+
+        context_text, citation_entries = _build_context(all_context)
 
         # Get AI settings from database
-        system_prompt = settings_mgr.get_setting("system_prompt", SYSTEM_PROMPT)
-        model = settings_mgr.get_setting("openai_model", "gpt-4-turbo-preview")
-        temperature = float(settings_mgr.get_setting("temperature", 0.7))
-        max_tokens = int(settings_mgr.get_setting("max_tokens", 1000))
-        api_key = settings_mgr.get_setting("openai_api_key", "")
+        system_prompt = settings_cache.get("system_prompt", SYSTEM_PROMPT)
+        model = settings_cache.get("openai_model", "gpt-4-turbo-preview")
+        temperature = float(settings_cache.get("temperature", 0.7))
+        max_tokens = int(settings_cache.get("max_tokens", 1000))
+        api_key = settings_cache.get("openai_api_key", "")
 
         # Initialize OpenAI client with settings-based API key
         openai_client = None
@@ -319,24 +799,17 @@ async def chat(
 
         if api_key and api_key.strip():
             try:
-                from openai import OpenAI
-                openai_client = OpenAI(api_key=api_key.strip())
+                openai_client = get_openai_client(api_key.strip())
                 use_real_ai = True
-                print(f"✓ Using OpenAI with model: {model}")
+                logger.debug("Using OpenAI with model: %s", model)
             except Exception as e:
-                print(f"⚠ OpenAI initialization failed: {e}")
+                logger.warning("OpenAI initialization failed: %s", e)
                 use_real_ai = False
 
         # Generate response
         if use_real_ai and openai_client:
             # Use real OpenAI
             try:
-                # Build context from chunks
-                context_text = "\n\n".join([
-                    f"[{chunk.get('title', 'Unknown')}]\n{chunk.get('content', '')}"
-                    for chunk in all_context
-                ])
-
                 # Build messages with context
                 augmented_messages = [
                     {"role": "system", "content": system_prompt}
@@ -358,10 +831,10 @@ async def chat(
                 )
 
                 response_text = response.choices[0].message.content
-                print(f"✓ Generated response using {model}")
+                logger.debug("Generated response using %s", model)
 
             except Exception as e:
-                print(f"✗ OpenAI API error: {e}")
+                logger.warning("OpenAI API error: %s", e)
                 # Fall back to dev mode
                 response_text = ai_provider.generate_chat_response(
                     messages=message_history,
@@ -382,21 +855,11 @@ async def chat(
                 max_tokens=max_tokens
             )
 
-        # Extract citations
-        enable_citations = settings_mgr.get_setting("enable_citations", True)
-        citations = []
-        if enable_citations:
-            citations = [
-                {
-                    "title": chunk.get("title"),
-                    "date": chunk.get("published_date"),
-                    "url": chunk.get("source_url")
-                }
-                for chunk in all_context
-                if chunk.get("title")
-            ]
+        # Citations were collected in the same pass as the context text
+        enable_citations = settings_cache.get("enable_citations", True)
+        citations = citation_entries if enable_citations else []
 
-        # Save assistant message
+        # Save both sides of the turn in one INSERT batch + commit
         assistant_message = Message(
             conversation_id=conversation.id,
             role="assistant",
@@ -407,16 +870,18 @@ async def chat(
                 "web_content_count": len(web_content)
             }
         )
-        db.add(assistant_message)
+        db.add_all([user_message, assistant_message])
         db.commit()
 
-        # Get booking URL if lead exists
+        # Get booking URL from the eager-loaded lead — no extra query
         booking_url = None
         if conversation.lead_id:
-            routing_service = RoutingService(db)
-            booking_url = routing_service.get_booking_url(conversation.lead_id)
+            lead = conversation.lead
+            booking_url = (lead.booking_url if lead and lead.booking_url
+                           else RoutingService.CALENDLY_URLS["general_15"])
 
-        return ChatResponse(
+        # Server-produced values — skip Pydantic validation
+        return ChatResponse.model_construct(
             response=response_text,
             session_id=request.session_id,
             show_lead_gate=False,
@@ -425,10 +890,8 @@ async def chat(
         )
 
     except Exception as e:
-        print(f"Chat error: {e}")
+        logger.error("Chat error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
-    finally:
-        settings_db.close()
 
 
 @app.post("/chat/stream")
@@ -459,15 +922,27 @@ async def chat_stream(
             # Store filename and content_type BEFORE reading (file gets closed after read)
             filename = file.filename
             content_type = file.content_type
-
-            # Read file content
-            content = await file.read()
-            file_size = len(content)
-
-            if file_size > MAX_FILE_SIZE:
+            is_text = bool(content_type) and ('text' in content_type or 'json' in content_type)
+
+            # Stream in 64KB chunks instead of buffering the whole upload:
+            # binary files only need their size and text files only their
+            # first 10k chars, so the old full read() pinned up to 500MB
+            # of bytes per file for nothing.
+            file_size = 0
+            head = b""
+            too_large = False
+            while chunk := await file.read(64 * 1024):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    too_large = True
+                    break
+                if is_text and len(head) < 10000:
+                    head += chunk
+
+            if too_large:
                 # Return error immediately if file too large
                 async def error_stream():
-                    yield f"data: {json.dumps({'type': 'error', 'error': f'File {filename} exceeds 0.5GB limit'})}\n\n"
+                    yield sse("error", error=f"File {filename} exceeds 0.5GB limit")
                 return StreamingResponse(error_stream(), media_type="text/event-stream")
 
             # Store file info
@@ -478,32 +953,38 @@ async def chat_stream(
             }
             file_metadata.append(file_info)
 
-            # For text files, extract content
-            if content_type and ('text' in content_type or 'json' in content_type):
-                try:
-                    text_content = content.decode('utf-8')
-                    file_contents.append(f"File: {filename}\n{text_content[:10000]}")  # Limit to 10k chars
-                except:
-                    file_contents.append(f"File: {filename} (binary file, {file_size} bytes)")
+            # For text files, extract content from the retained head
+            if is_text:
+                text_content = head[:10000].decode('utf-8', errors='replace')
+                file_contents.append(f"File: {filename}\n{text_content}")  # Limit to 10k chars
             else:
                 # For binary files, just note the file
                 file_contents.append(f"File: {filename} ({content_type}, {file_size} bytes)")
 
     async def generate_stream():
         try:
-            print("🔧 Starting generate_stream")
-            # Load settings with a separate session to avoid transaction conflicts
-            settings_db = SessionLocal()
-            print(f"✓ Created settings_db session: {type(settings_db)}")
-            settings_mgr = SettingsManager(settings_db)
-            print("✓ Created settings_mgr")
+            logger.debug("Starting generate_stream")
 
             # Get or create conversation
-            print(f"🔧 Querying conversation for session: {session_id}")
-            conversation = db.query(Conversation).filter(
-                Conversation.session_id == session_id
+            logger.debug("Querying conversation for session: %s", session_id)
+            # One round-trip for the gate decision: conversation plus its
+            # assistant-message count via a correlated scalar subquery
+            row = db.execute(
+                select(
+                    Conversation,
+                    select(func.count())
+                    .select_from(Message)
+                    .where(
+                        Message.conversation_id == Conversation.id,
+                        Message.role == "assistant",
+                    )
+                    .scalar_subquery()
+                    .label("assistant_count"),
+                ).where(Conversation.session_id == session_id)
             ).first()
-            print(f"✓ Found conversation: {conversation.id if conversation else 'None'}")
+            conversation = row[0] if row else None
+            assistant_message_count = row[1] if row else 0
+            logger.debug("Found conversation: %s", conversation.id if conversation else None)
 
             if not conversation:
                 conversation = Conversation(
@@ -524,48 +1005,46 @@ async def chat_stream(
                 message_content += "\n\n[Attached files: " + ", ".join([f['filename'] for f in file_metadata]) + "]"
 
             # Save user message
+            # Built now, inserted later: the user message commits in the
+            # same transaction as the assistant reply (or gate return)
             user_message = Message(
                 conversation_id=conversation.id,
                 role="user",
                 content=message_content,
                 extra_data={"files": file_metadata} if file_metadata else {}
             )
-            db.add(user_message)
-            db.commit()
 
             # Check lead gate
-            print("🔧 Getting enable_lead_gate setting...")
-            enable_lead_gate = settings_mgr.get_setting("enable_lead_gate", True)
-            print(f"✓ enable_lead_gate = {enable_lead_gate}")
-
-            print("🔧 Querying assistant message count...")
-            assistant_message_count = db.query(Message).filter(
-                Message.conversation_id == conversation.id,
-                Message.role == "assistant"
-            ).count()
-            print(f"✓ assistant_message_count = {assistant_message_count}")
+            enable_lead_gate = settings_cache.get("enable_lead_gate", True)
+            logger.debug("assistant_message_count = %s", assistant_message_count)
 
             show_lead_gate = enable_lead_gate and assistant_message_count >= 1 and not conversation.lead_id
 
             if show_lead_gate:
-                lead_gate_msg = settings_mgr.get_setting(
+                lead_gate_msg = settings_cache.get(
                     "lead_gate_message",
                     "Before we keep going, where should we send your summary and how can we reach you?"
                 )
-                yield f"data: {json.dumps({'type': 'lead_gate', 'content': lead_gate_msg})}\n\n"
+                db.add(user_message)
+                db.commit()
+                yield sse("lead_gate", content=lead_gate_msg)
                 return
 
+            # SSE batching knobs: coalesce tiny token deltas into fewer
+            # frames (flush at ~size bytes or after timeout seconds)
+            sse_buffer_size = int(settings_cache.get("sse_buffer_size", 64))
+            sse_buffer_timeout = float(settings_cache.get("sse_buffer_timeout", 0.02))
+
             # Check if using your custom Clarity prompt
             prompt_id = os.getenv("OPENAI_PROMPT_ID", "pmpt_6962e013d6d88196b1c3834baa00e88500912c21d3085185")
 
             # Get API key and strip any whitespace/newlines
             api_key = os.getenv("OPENAI_API_KEY", "").strip()
             if not api_key:
-                yield f"data: {json.dumps({'type': 'error', 'error': 'OpenAI API key not configured'})}\n\n"
+                yield sse("error", error="OpenAI API key not configured")
                 return
 
-            from openai import OpenAI
-            openai_client = OpenAI(api_key=api_key)
+            openai_client = get_async_openai_client(api_key)
 
             # Build message with file context if needed
             user_input = message
@@ -575,7 +1054,7 @@ async def chat_stream(
 
             # Try to use Prompts/Responses API with your Clarity prompt (includes vector store!)
             if prompt_id:
-                print(f"✓ Using Clarity prompt (includes Clarity Storage): {prompt_id[:20]}...")
+                logger.debug("Using Clarity prompt (includes Clarity Storage): %.20s...", prompt_id)
                 try:
                     # Check if responses API is available
                     if hasattr(openai_client, 'beta') and hasattr(openai_client.beta, 'responses'):
@@ -586,20 +1065,26 @@ async def chat_stream(
                         raise AttributeError("Responses API not available")
 
                     # Use your prompt (already includes Clarity Storage + instructions)
-                    stream = responses_api.create(
+                    stream = await responses_api.create(
                         prompt={"id": prompt_id, "version": "latest"},
                         input=user_input,
                         stream=True
                     )
 
                     full_response = ""
-                    for event in stream:
+                    batcher = _ContentBatcher(sse_buffer_size, sse_buffer_timeout)
+                    async for event in iter_buffered(stream):
                         if hasattr(event, 'delta') and event.delta:
                             content = event.delta
                             full_response += content
-                            yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                            frame = batcher.add(content)
+                            if frame:
+                                yield frame
 
-                    yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                    frame = batcher.flush()
+                    if frame:
+                        yield frame
+                    yield DONE_FRAME
 
                     # Save assistant response
                     assistant_message = Message(
@@ -608,57 +1093,80 @@ async def chat_stream(
                         content=full_response,
                         extra_data={}
                     )
-                    db.add(assistant_message)
+                    db.add_all([user_message, assistant_message])
                     db.commit()
                     return
 
                 except Exception as e:
                     import traceback
-                    print(f"⚠ Responses API error: {e}")
-                    print(f"Full error traceback:\n{traceback.format_exc()}")
-                    print("Falling back to standard chat...")
+                    logger.warning("Responses API error: %s", e)
+                    logger.debug("Full error traceback:\n%s", traceback.format_exc())
+                    logger.debug("Falling back to standard chat...")
 
             # Fallback to standard chat (if Responses API not available)
-            enable_rag = settings_mgr.get_setting("enable_rag", True)
-            rag_chunk_limit = int(settings_mgr.get_setting("rag_chunk_limit", 3))
+            enable_rag = settings_cache.get("enable_rag", True)
+            rag_chunk_limit = int(settings_cache.get("rag_chunk_limit", 3))
+
+            # Semantic cache first (same instance as /chat), then web
+            # scraping + RAG in parallel on worker threads
+            query_embedding = await asyncio.to_thread(ai_provider.generate_embedding, message)
+            cached = _retrieval_cache.get(query_embedding)
+
+            if cached is not None:
+                web_content, context_chunks = cached
+            else:
+                rag_service = RAGService(db)
+                scraped_pages, context_chunks = await asyncio.gather(
+                    asyncio.to_thread(web_scraper.search_site, message),
+                    asyncio.to_thread(rag_service.retrieve_relevant_chunks, message, rag_chunk_limit)
+                    if enable_rag else _empty_list(),
+                    return_exceptions=True,
+                )
+                if isinstance(scraped_pages, BaseException):
+                    logger.warning("Web scraping error: %s", scraped_pages)
+                    scraped_pages = []
+                if isinstance(context_chunks, BaseException):
+                    logger.warning("RAG retrieval error: %s", context_chunks)
+                    context_chunks = []
 
-            # Web scraping
-            web_content = []
-            try:
-                scraped_pages = web_scraper.search_site(message)
                 web_content = [
-                    {
-                        "title": page["title"],
-                        "content": page["content"][:1000],
-                        "source_url": page["url"],
-                        "published_date": "Recent"
-                    }
+                    RagChunk(
+                        title=page["title"],
+                        content=page["content"][:1000],
+                        source_url=page["url"],
+                        published_date="Recent",
+                    )
                     for page in scraped_pages
                 ]
-            except Exception as e:
-                print(f"⚠ Web scraping error: {e}")
+                _retrieval_cache.put(query_embedding, (web_content, context_chunks))
 
-            # RAG
-            rag_service = RAGService(db)
-            context_chunks = rag_service.retrieve_relevant_chunks(message, limit=rag_chunk_limit) if enable_rag else []
-            all_context = web_content + context_chunks
+            all_context = _dedup_context(web_content, context_chunks)
 
-            # Get message history
-            recent_messages = db.query(Message).filter(
-                Message.conversation_id == conversation.id,
-                Message.role.in_(["user", "assistant"])
-            ).order_by(Message.created_at.desc()).limit(6).all()
+            # Get message history as plain (role, content) rows — no ORM
+            # hydration or identity-map bookkeeping for read-only tuples
+            history_rows = db.execute(
+                select(Message.role, Message.content)
+                .where(
+                    Message.conversation_id == conversation.id,
+                    Message.role.in_(["user", "assistant"]),
+                )
+                .order_by(Message.created_at.desc())
+                .limit(5)
+            ).all()
 
             message_history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in reversed(recent_messages)
+                {"role": role, "content": content}
+                for role, content in reversed(history_rows)
             ]
+            # The current user message is deferred until final commit, so it
+            # isn't in the DB yet — append it by hand
+            message_history.append({"role": "user", "content": message})
 
             # Get AI settings (use environment variables for API key and prompt)
-            system_prompt = settings_mgr.get_setting("system_prompt", "You are a helpful assistant.")
-            model = settings_mgr.get_setting("openai_model", "gpt-4-turbo-preview")
-            temperature = float(settings_mgr.get_setting("temperature", 0.7))
-            max_tokens = int(settings_mgr.get_setting("max_tokens", 1000))
+            system_prompt = settings_cache.get("system_prompt", "You are a helpful assistant.")
+            model = settings_cache.get("openai_model", "gpt-4-turbo-preview")
+            temperature = float(settings_cache.get("temperature", 0.7))
+            max_tokens = int(settings_cache.get("max_tokens", 1000))
 
             # Use environment variables for API key and prompt (same as above)
             fallback_api_key = os.getenv("OPENAI_API_KEY", "")
@@ -667,18 +1175,14 @@ async def chat_stream(
 
             if not fallback_api_key or not fallback_api_key.strip():
                 # Dev mode fallback
-                yield f"data: {json.dumps({'type': 'content', 'content': 'Running in dev mode. Please configure your OpenAI API key in the admin panel.'})}\n\n"
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                yield sse("content", content="Running in dev mode. Please configure your OpenAI API key in the admin panel.")
+                yield DONE_FRAME
                 return
 
             # Stream from OpenAI
-            from openai import OpenAI
-            openai_client = OpenAI(api_key=fallback_api_key.strip())
+            openai_client = get_async_openai_client(fallback_api_key.strip())
 
-            context_text = "\n\n".join([
-                f"[{chunk.get('title', 'Unknown')}]\n{chunk.get('content', '')}"
-                for chunk in all_context
-            ])
+            context_text, _ = _build_context(all_context)
 
             # Build context for prompt
             additional_context = []
@@ -692,12 +1196,7 @@ async def chat_stream(
             context_string = "\n\n".join(additional_context) if additional_context else ""
 
             # Debug logging
-            print(f"=== PROMPT CONFIGURATION ===")
-            print(f"Prompt ID: '{prompt_id}'")
-            print(f"Prompt Version: '{prompt_version}'")
-            print(f"Has prompt_id: {bool(prompt_id)}")
-            print(f"Stripped prompt_id: '{prompt_id.strip() if prompt_id else ''}'")
-            print(f"===========================")
+            logger.debug("Prompt configuration: id=%r version=%r", prompt_id, prompt_version)
 
             # Check if using Prompt API with prompt_id
             if prompt_id and prompt_id.strip():
@@ -720,62 +1219,71 @@ async def chat_stream(
                     prompt_version_env = os.getenv("OPENAI_PROMPT_VERSION", "")
                     if prompt_version_env and prompt_version_env.strip():
                         prompt_config["version"] = prompt_version_env.strip()
-                        print(f"  Using prompt version: {prompt_version_env.strip()}")
+                        logger.debug("Using prompt version: %s", prompt_version_env.strip())
                     else:
-                        print(f"  Using default/active prompt version")
+                        logger.debug("Using default/active prompt version")
 
                     # Match OpenAI's example: only prompt and stream parameters
-                    stream = responses_api.create(
+                    stream = await responses_api.create(
                         prompt=prompt_config,
                         input=message,  # User message
                         stream=True
                     )
-                    print(f"✓ Using OpenAI Responses API with prompt ID: {prompt_id}")
-                    print(f"  Message: {message[:80]}...")
+                    logger.debug("Using OpenAI Responses API with prompt ID: %s", prompt_id)
+                    logger.debug("Message: %.80s...", message)
 
                     # Process the stream immediately (don't fall through to fallback)
                     full_response = ""
-                    for chunk in stream:
+                    batcher = _ContentBatcher(sse_buffer_size, sse_buffer_timeout)
+                    async for chunk in iter_buffered(stream):
                         try:
                             # Responses API uses event-based streaming
                             if hasattr(chunk, 'type'):
                                 event_type = chunk.type
-                                print(f"  Event type: {event_type}")
 
                                 # Text delta events contain the streaming content
-                                if event_type == 'response.output_text.delta':
+                                if event_type == EVENT_DELTA:
                                     if hasattr(chunk, 'delta') and chunk.delta:
                                         content = chunk.delta
                                         full_response += content
-                                        yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                                        frame = batcher.add(content)
+                                        if frame:
+                                            yield frame
 
                                 # Final text event (fallback)
-                                elif event_type == 'response.output_text.done':
+                                elif event_type == EVENT_TEXT_DONE:
                                     if hasattr(chunk, 'text') and chunk.text:
                                         # If we somehow missed deltas, use the final text
                                         if not full_response or len(chunk.text) > len(full_response):
                                             missing_content = chunk.text[len(full_response):]
                                             if missing_content:
                                                 full_response = chunk.text
-                                                yield f"data: {json.dumps({'type': 'content', 'content': missing_content})}\n\n"
+                                                frame = batcher.add(missing_content)
+                                                if frame:
+                                                    yield frame
 
                             # Fallback: if chunk has content attribute directly
                             elif hasattr(chunk, 'content'):
                                 content = str(chunk.content)
                                 if content and content not in full_response:
                                     full_response += content
-                                    yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                                    frame = batcher.add(content)
+                                    if frame:
+                                        yield frame
                             else:
-                                print(f"  Unknown chunk format: {chunk}")
+                                logger.debug("Unknown chunk format: %s", chunk)
 
                         except Exception as chunk_error:
-                            print(f"⚠ Error processing chunk: {chunk_error}")
-                            print(f"  Chunk type: {type(chunk)}")
+                            logger.warning("Error processing chunk: %s", chunk_error)
+                            logger.debug("Chunk type: %s", type(chunk))
                             if hasattr(chunk, '__dict__'):
-                                print(f"  Chunk attributes: {list(chunk.__dict__.keys())}")
+                                logger.debug("Chunk attributes: %s", list(chunk.__dict__.keys()))
                             continue
 
-                    yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                    frame = batcher.flush()
+                    if frame:
+                        yield frame
+                    yield DONE_FRAME
 
                     # Save assistant response
                     assistant_message = Message(
@@ -784,15 +1292,15 @@ async def chat_stream(
                         content=full_response,
                         extra_data={}
                     )
-                    db.add(assistant_message)
+                    db.add_all([user_message, assistant_message])
                     db.commit()
                     return  # Exit after successful Responses API call
 
                 except Exception as e:
                     import traceback
-                    print(f"⚠ Error using Responses API: {e}")
-                    print(f"Full traceback:\n{traceback.format_exc()}")
-                    print(f"Falling back to standard completion")
+                    logger.warning("Error using Responses API: %s", e)
+                    logger.debug("Full traceback:\n%s", traceback.format_exc())
+                    logger.debug("Falling back to standard completion")
                     # Fallback to standard completion
                     augmented_messages = [
                         {"role": "system", "content": system_prompt}
@@ -801,7 +1309,7 @@ async def chat_stream(
                         augmented_messages.append({"role": "system", "content": context_string})
                     augmented_messages.extend(message_history)
 
-                    stream = openai_client.chat.completions.create(
+                    stream = await openai_client.chat.completions.create(
                         model=model,
                         messages=augmented_messages,
                         temperature=temperature,
@@ -817,7 +1325,7 @@ async def chat_stream(
                     augmented_messages.append({"role": "system", "content": context_string})
                 augmented_messages.extend(message_history)
 
-                stream = openai_client.chat.completions.create(
+                stream = await openai_client.chat.completions.create(
                     model=model,
                     messages=augmented_messages,
                     temperature=temperature,
@@ -826,11 +1334,13 @@ async def chat_stream(
                 )
 
             full_response = ""
+            batcher = _ContentBatcher(sse_buffer_size, sse_buffer_timeout)
+            citation_scanner = _CitationScanner()
 
             # Determine if using Responses API or Chat Completions API
             is_responses_api = prompt_id and prompt_id.strip()
 
-            for chunk in stream:
+            async for chunk in iter_buffered(stream):
                 try:
                     if is_responses_api:
                         # Responses API uses event-based streaming
@@ -839,28 +1349,37 @@ async def chat_stream(
                             event_type = chunk.type
 
                             # Text delta events contain the streaming content
-                            if event_type == 'response.output_text.delta':
+                            if event_type == EVENT_DELTA:
                                 if hasattr(chunk, 'delta') and chunk.delta:
                                     content = chunk.delta
                                     full_response += content
-                                    yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                                    citation_scanner.feed(content)
+                                    frame = batcher.add(content)
+                                    if frame:
+                                        yield frame
 
                             # Final text event (fallback)
-                            elif event_type == 'response.output_text.done':
+                            elif event_type == EVENT_TEXT_DONE:
                                 if hasattr(chunk, 'text') and chunk.text:
                                     # If we somehow missed deltas, use the final text
                                     if not full_response or len(chunk.text) > len(full_response):
                                         missing_content = chunk.text[len(full_response):]
                                         if missing_content:
                                             full_response = chunk.text
-                                            yield f"data: {json.dumps({'type': 'content', 'content': missing_content})}\n\n"
+                                            citation_scanner.feed(missing_content)
+                                            frame = batcher.add(missing_content)
+                                            if frame:
+                                                yield frame
 
                         # Fallback: if chunk has content attribute directly
                         elif hasattr(chunk, 'content'):
                             content = str(chunk.content)
                             if content and content not in full_response:
                                 full_response += content
-                                yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                                citation_scanner.feed(content)
+                                frame = batcher.add(content)
+                                if frame:
+                                    yield frame
 
                     else:
                         # Standard Chat Completions API streaming
@@ -869,15 +1388,22 @@ async def chat_stream(
                             if hasattr(delta, 'content') and delta.content:
                                 content = delta.content
                                 full_response += content
-                                yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                                citation_scanner.feed(content)
+                                frame = batcher.add(content)
+                                if frame:
+                                    yield frame
 
                 except Exception as chunk_error:
-                    print(f"⚠ Error processing chunk: {chunk_error}")
-                    print(f"  Chunk type: {type(chunk)}")
+                    logger.warning("Error processing chunk: %s", chunk_error)
+                    logger.debug("Chunk type: %s", type(chunk))
                     if hasattr(chunk, '__dict__'):
-                        print(f"  Chunk attributes: {list(chunk.__dict__.keys())}")
+                        logger.debug("Chunk attributes: %s", list(chunk.__dict__.keys()))
                     continue
 
+            frame = batcher.flush()
+            if frame:
+                yield frame
+
             # Save assistant message
             assistant_message = Message(
                 conversation_id=conversation.id,
@@ -888,68 +1414,31 @@ async def chat_stream(
                     "web_content_count": len(web_content)
                 }
             )
-            db.add(assistant_message)
+            db.add_all([user_message, assistant_message])
 
             # Update conversation timestamp
-            conversation.updated_at = datetime.utcnow()
+            conversation.updated_at = datetime.now(timezone.utc)
             db.commit()
 
-            # Parse Related Resources from AI response
-            # Look for "Related Resources:" section and extract URLs and titles
-            import re
-
+            # Related Resources were collected incrementally while streaming
             resources = []
-            enable_citations = settings_mgr.get_setting("enable_citations", True)
+            enable_citations = settings_cache.get("enable_citations", True)
 
             if enable_citations:
-                # Pattern to match "Related Resources:" section
-                resources_match = re.search(r'Related Resources?:?\s*\n((?:[-•]\s*.*\n?)+)', full_response, re.IGNORECASE)
-
-                if resources_match:
-                    resources_text = resources_match.group(1)
-
-                    # Pattern to match resource lines with optional URLs
-                    # Matches: "- Title: URL" or "- Title" or "• Title (URL)"
-                    resource_lines = re.findall(r'[-•]\s*([^\n]+)', resources_text)
-
-                    for line in resource_lines:
-                        # Try to extract URL from the line
-                        url_match = re.search(r'https?://[^\s\)]+', line)
-                        url = url_match.group(0) if url_match else None
-
-                        # Extract title (remove URL from title if present)
-                        if url:
-                            title = re.sub(r'\s*[\(\[]?\s*https?://[^\s\)\]]+[\)\]]?\s*', '', line).strip()
-                            # Remove common separators between title and URL
-                            title = re.sub(r':\s*$', '', title).strip()
-                        else:
-                            title = line.strip()
-
-                        # Clean up title
-                        title = title.strip('- •:').strip()
-
-                        if title:
-                            resources.append({
-                                "title": title,
-                                "url": url,
-                                "date": None
-                            })
+                resources = citation_scanner.resources()
 
                 # Only send resources if AI provided them - no RAG fallback
                 if resources:
-                    yield f"data: {json.dumps({'type': 'citations', 'citations': resources})}\n\n"
+                    yield sse("citations", citations=resources)
 
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield DONE_FRAME
 
         except Exception as e:
             import traceback
-            print(f"✗ Streaming error: {e}")
-            print(f"Full traceback:\n{traceback.format_exc()}")
+            logger.error("Streaming error: %s", e)
+            logger.debug("Full traceback:\n%s", traceback.format_exc())
             db.rollback()  # Rollback failed transaction
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
-        finally:
-            # Close the separate settings session
-            settings_db.close()
+            yield sse("error", error=str(e))
 
     return StreamingResponse(generate_stream(), media_type="text/event-stream")
 
@@ -1004,12 +1493,15 @@ async def create_lead(
             }
         )
         db.add(consent_event)
+        # Single commit covers the lead upsert, the conversation link and
+        # the consent event — one fsync, and they land (or roll back)
+        # atomically
         db.commit()
 
         return LeadResponse(**lead_info)
 
     except Exception as e:
-        print(f"Lead creation error: {e}")
+        logger.error("Lead creation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error creating lead: {str(e)}")
 
 
@@ -1023,6 +1515,23 @@ async def ingest_document(
     Creates document and chunks with embeddings.
     """
     try:
+        # Content-hash dedup: a re-seed of an unchanged source short-
+        # circuits here, before any chunking or embedding work
+        if request.content_hash and request.source_url:
+            existing = db.query(Document).filter(
+                Document.source_url == request.source_url
+            ).first()
+            if existing and (existing.extra_data or {}).get("content_hash") == request.content_hash:
+                chunk_count = db.query(func.count(Chunk.id)).filter(
+                    Chunk.document_id == existing.id
+                ).scalar()
+                return {
+                    "document_id": existing.id,
+                    "title": existing.title,
+                    "chunk_count": chunk_count,
+                    "status": existing.status.value,
+                }
+
         # Parse published_date if provided
         published_date = None
         if request.published_date:
@@ -1038,7 +1547,8 @@ async def ingest_document(
             source_url=request.source_url,
             source_type=request.source_type,
             published_date=published_date,
-            status=DocumentStatus.DRAFT
+            status=DocumentStatus.DRAFT,
+            extra_data={"content_hash": request.content_hash} if request.content_hash else {}
         )
         db.add(document)
         db.commit()
@@ -1047,26 +1557,29 @@ async def ingest_document(
         # Chunk content (simple paragraph-based chunking)
         chunks = _chunk_content(request.content)
 
-        # Create chunk records with embeddings
-        chunk_count = 0
-        for idx, chunk_text in enumerate(chunks):
-            # Generate embedding
-            embedding = ai_provider.generate_embedding(chunk_text)
-
-            # Count tokens (rough estimate)
-            token_count = len(chunk_text.split())
-
-            chunk = Chunk(
-                document_id=document.id,
-                content=chunk_text,
-                chunk_index=idx,
-                token_count=token_count,
-                embedding=str(embedding) if embedding else None
-            )
-            db.add(chunk)
-            chunk_count += 1
-
+        # One embeddings API round-trip for the whole document instead of
+        # one HTTP call per chunk
+        embeddings = ai_provider.generate_embeddings_batch(chunks)
+
+        # Build plain column dicts and insert them through Core
+        # insertmanyvalues paging — no ORM instances or per-row flushes
+        chunk_rows = [
+            {
+                "document_id": document.id,
+                "content": chunk_text,
+                "chunk_index": idx,
+                # Rough whitespace token estimate without materializing a
+                # word list per chunk
+                "token_count": chunk_text.count(" ") + 1,
+                # The Vector column serializes the float list itself
+                "embedding": embedding,
+            }
+            for idx, (chunk_text, embedding) in enumerate(zip(chunks, embeddings))
+        ]
+        Chunk.bulk_insert(db, chunk_rows)
         db.commit()
+        RAGService.invalidate_embedding_cache()
+        chunk_count = len(chunk_rows)
 
         return {
             "document_id": document.id,
@@ -1076,10 +1589,92 @@ async def ingest_document(
         }
 
     except Exception as e:
-        print(f"Ingestion error: {e}")
+        logger.error("Ingestion error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error ingesting document: {str(e)}")
 
 
+@app.get("/admin/ingest/capabilities")
+async def ingest_capabilities():
+    """Feature probe for seeding clients.
+
+    Lets a client pick the cheapest ingest path (bulk approval,
+    multipart upload, content-hash dedup) without branching on server
+    version strings.
+    """
+    return {"bulk": True, "multipart": True, "hash_dedup": True, "gzip": True}
+
+
+@app.post("/admin/ingest-file")
+async def ingest_document_file(
+    file: UploadFile = File(...),
+    title: str = Form(...),
+    source_url: Optional[str] = Form(None),
+    source_type: Optional[str] = Form("markdown"),
+    published_date: Optional[str] = Form(None),
+    content_hash: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Multipart sibling of /admin/ingest.
+
+    The document arrives as a streamed file part (Starlette spools large
+    uploads to disk) instead of one JSON-escaped string, so neither side
+    holds an extra encoded copy of a big file in memory.
+    """
+    payload = await file.read()
+    request = IngestRequest(
+        title=title,
+        content=payload.decode("utf-8"),
+        source_url=source_url,
+        source_type=source_type,
+        published_date=published_date,
+        content_hash=content_hash,
+    )
+    return await ingest_document(request, db)
+
+
+@app.get("/admin/documents")
+async def list_documents(status: Optional[str] = None, db: Session = Depends(get_db)):
+    """List documents (id, title, status), optionally filtered by status."""
+    try:
+        query = select(Document.id, Document.title, Document.status).order_by(Document.id)
+        if status:
+            try:
+                query = query.where(Document.status == DocumentStatus(status))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Unknown status: {status}")
+
+        return [
+            {
+                "id": row.id,
+                "title": row.title,
+                "status": row.status.value if hasattr(row.status, "value") else row.status,
+            }
+            for row in db.execute(query)
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
+
+
+@app.post("/admin/documents/approve-bulk")
+async def approve_documents_bulk(request: BulkApproveRequest, db: Session = Depends(get_db)):
+    """Approve many documents with one UPDATE in one transaction."""
+    try:
+        updated = db.execute(
+            update(Document)
+            .where(Document.id.in_(request.ids))
+            .values(status=DocumentStatus.APPROVED, updated_at=datetime.now(timezone.utc))
+        ).rowcount
+        db.commit()
+        RAGService.invalidate_embedding_cache()
+
+        return {"approved": updated, "requested": len(request.ids)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error approving documents: {str(e)}")
+
+
 @app.post("/admin/approve/{doc_id}")
 async def approve_document(doc_id: int, db: Session = Depends(get_db)):
     """Approve a document for retrieval."""
@@ -1089,8 +1684,9 @@ async def approve_document(doc_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Document not found")
 
         document.status = DocumentStatus.APPROVED
-        document.updated_at = datetime.utcnow()
+        document.updated_at = datetime.now(timezone.utc)
         db.commit()
+        RAGService.invalidate_embedding_cache()
 
         return {
             "document_id": document.id,
@@ -1109,7 +1705,11 @@ def _chunk_content(content: str, min_chunk_size: int = 300, max_chunk_size: int
     """
     paragraphs = content.split("\n\n")
     chunks = []
-    current_chunk = ""
+    # Accumulate paragraphs in a list and join once per chunk: repeated
+    # str += reallocates the whole buffer each time (quadratic in chunk
+    # size), while join pre-computes the final length and copies once.
+    current_parts = []
+    current_len = 0
 
     for para in paragraphs:
         para = para.strip()
@@ -1117,21 +1717,24 @@ def _chunk_content(content: str, min_chunk_size: int = 300, max_chunk_size: int
             continue
 
         # If adding this paragraph exceeds max size, save current chunk
-        if current_chunk and len(current_chunk) + len(para) > max_chunk_size:
-            if len(current_chunk) >= min_chunk_size:
-                chunks.append(current_chunk)
-                current_chunk = para
+        if current_parts and current_len + len(para) > max_chunk_size:
+            if current_len >= min_chunk_size:
+                chunks.append("\n\n".join(current_parts))
+                current_parts = [para]
+                current_len = len(para)
             else:
-                current_chunk += "\n\n" + para
+                current_parts.append(para)
+                current_len += len(para) + 2
         else:
-            if current_chunk:
-                current_chunk += "\n\n" + para
+            if current_parts:
+                current_len += len(para) + 2
             else:
-                current_chunk = para
+                current_len = len(para)
+            current_parts.append(para)
 
     # Add remaining chunk
-    if current_chunk:
-        chunks.append(current_chunk)
+    if current_parts:
+        chunks.append("\n\n".join(current_parts))
 
     return chunks
 
@@ -1181,6 +1784,7 @@ async def update_setting(
             value.get("type"),
             value.get("description")
         )
+        settings_cache.invalidate()
         return {
             "key": key,
             "value": value.get("value"),
@@ -1197,6 +1801,7 @@ async def reset_settings(db: Session = Depends(get_db)):
     try:
         settings_mgr = SettingsManager(db)
         settings_mgr.reset_to_defaults()
+        settings_cache.invalidate()
         return {"message": "Settings reset to defaults", "settings": settings_mgr.get_all_settings()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error resetting settings: {str(e)}")
@@ -1232,12 +1837,23 @@ async def get_user_sessions(user_id: str, db: Session = Depends(get_db)):
             Conversation.user_id == user_id
         ).order_by(Conversation.updated_at.desc()).all()
 
+        # One grouped count instead of lazy-loading every conversation's
+        # messages collection just to len() it (N+1)
+        counts = {}
+        if conversations:
+            counts = dict(
+                db.query(Message.conversation_id, func.count(Message.id))
+                .filter(Message.conversation_id.in_([c.id for c in conversations]))
+                .group_by(Message.conversation_id)
+                .all()
+            )
+
         return [{
             "session_id": conv.session_id,
             "title": conv.title or "New Chat",
             "created_at": conv.created_at.isoformat(),
             "updated_at": conv.updated_at.isoformat(),
-            "message_count": len(conv.messages)
+            "message_count": counts.get(conv.id, 0)
         } for conv in conversations]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sessions: {str(e)}")
@@ -1325,17 +1941,35 @@ async def update_session_title(
 ):
     """Update the title of a chat session."""
     try:
-        conversation = db.query(Conversation).filter(
-            Conversation.session_id == session_id
-        ).first()
+        # Store title in extra_data since Conversation model doesn't have title field
+        if engine.dialect.name == "postgresql":
+            # Merge the key server-side: one UPDATE, no prior SELECT or
+            # ORM hydration; rowcount doubles as the existence check
+            result = db.execute(
+                text(
+                    "UPDATE conversations "
+                    "SET extra_data = jsonb_set(coalesce(extra_data, '{}'::jsonb), "
+                    "'{title}', to_jsonb(:title::text)), "
+                    "updated_at = now() "
+                    "WHERE session_id = :session_id"
+                ),
+                {"title": title, "session_id": session_id},
+            )
+            db.commit()
+            if result.rowcount == 0:
+                raise HTTPException(status_code=404, detail="Session not found")
+        else:
+            # SQLite has no jsonb_set — read-modify-write in one transaction
+            conversation = db.query(Conversation).filter(
+                Conversation.session_id == session_id
+            ).first()
 
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Session not found")
+            if not conversation:
+                raise HTTPException(status_code=404, detail="Session not found")
 
-        # Store title in extra_data since Conversation model doesn't have title field
-        conversation.extra_data = {**conversation.extra_data, "title": title}
-        conversation.updated_at = datetime.utcnow()
-        db.commit()
+            conversation.extra_data = {**conversation.extra_data, "title": title}
+            conversation.updated_at = datetime.now(timezone.utc)
+            db.commit()
 
         return {"message": "Title updated successfully", "title": title}
     except HTTPException:
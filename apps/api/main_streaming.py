@@ -6,10 +6,9 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict
 from sqlalchemy.orm import Session
-import json
 import asyncio
 
-from main import get_db, SettingsManager, Conversation, Message, RAGService, web_scraper
+from main import get_db, SettingsManager, Conversation, Message, RAGService, RagChunk, web_scraper, sse, DONE_FRAME, get_async_openai_client
 
 
 class StreamChatRequest(BaseModel):
@@ -39,15 +38,15 @@ async def generate_stream(
             db.commit()
             db.refresh(conversation)
 
-        # Save user message
+        # Build the user message but defer the INSERT: it lands in the
+        # same commit as the assistant reply, so one fsync per request
+        # and no orphan user rows when the LLM call fails
         user_message = Message(
             conversation_id=conversation.id,
             role="user",
             content=request.message,
             extra_data=request.metadata
         )
-        db.add(user_message)
-        db.commit()
 
         # Check lead gate
         enable_lead_gate = settings_mgr.get_setting("enable_lead_gate", True)
@@ -63,7 +62,9 @@ async def generate_stream(
                 "lead_gate_message",
                 "Before we keep going, where should we send your summary and how can we reach you?"
             )
-            yield f"data: {json.dumps({'type': 'lead_gate', 'content': lead_gate_msg})}\n\n"
+            db.add(user_message)
+            db.commit()
+            yield sse("lead_gate", content=lead_gate_msg)
             return
 
         # Get context
@@ -75,12 +76,12 @@ async def generate_stream(
         try:
             scraped_pages = web_scraper.search_site(request.message)
             web_content = [
-                {
-                    "title": page["title"],
-                    "content": page["content"][:1000],
-                    "source_url": page["url"],
-                    "published_date": "Recent"
-                }
+                RagChunk(
+                    title=page["title"],
+                    content=page["content"][:1000],
+                    source_url=page["url"],
+                    published_date="Recent",
+                )
                 for page in scraped_pages
             ]
         except Exception as e:
@@ -95,12 +96,14 @@ async def generate_stream(
         recent_messages = db.query(Message).filter(
             Message.conversation_id == conversation.id,
             Message.role.in_(["user", "assistant"])
-        ).order_by(Message.created_at.desc()).limit(6).all()
+        ).order_by(Message.created_at.desc()).limit(5).all()
 
         message_history = [
             {"role": msg.role, "content": msg.content}
             for msg in reversed(recent_messages)
         ]
+        # The current user message isn't committed yet — append it by hand
+        message_history.append({"role": "user", "content": request.message})
 
         # Get AI settings
         system_prompt = settings_mgr.get_setting("system_prompt", "You are a helpful assistant.")
@@ -111,18 +114,17 @@ async def generate_stream(
 
         if not api_key or not api_key.strip():
             # Dev mode fallback
-            yield f"data: {json.dumps({'type': 'content', 'content': 'Dev mode: No API key configured'})}\n\n"
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield sse("content", content="Dev mode: No API key configured")
+            yield DONE_FRAME
             return
 
-        # Stream from OpenAI
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=api_key.strip())
+        # Stream from OpenAI without blocking the event loop between tokens
+        openai_client = get_async_openai_client(api_key.strip())
 
-        context_text = "\n\n".join([
-            f"[{chunk.get('title', 'Unknown')}]\n{chunk.get('content', '')}"
+        context_text = "\n\n".join(
+            f"[{chunk.title or 'Unknown'}]\n{chunk.content}"
             for chunk in all_context
-        ])
+        )
 
         augmented_messages = [
             {"role": "system", "content": system_prompt}
@@ -136,7 +138,7 @@ async def generate_stream(
 
         augmented_messages.extend(message_history)
 
-        stream = openai_client.chat.completions.create(
+        stream = await openai_client.chat.completions.create(
             model=model,
             messages=augmented_messages,
             temperature=temperature,
@@ -145,11 +147,11 @@ async def generate_stream(
         )
 
         full_response = ""
-        for chunk in stream:
+        async for chunk in stream:
             if chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
                 full_response += content
-                yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                yield sse("content", content=content)
 
         # Save assistant message
         assistant_message = Message(
@@ -161,7 +163,7 @@ async def generate_stream(
                 "web_content_count": len(web_content)
             }
         )
-        db.add(assistant_message)
+        db.add_all([user_message, assistant_message])
         db.commit()
 
         # Send citations
@@ -169,17 +171,17 @@ async def generate_stream(
         if enable_citations and all_context:
             citations = [
                 {
-                    "title": chunk.get("title"),
-                    "date": chunk.get("published_date"),
-                    "url": chunk.get("source_url")
+                    "title": chunk.title,
+                    "date": chunk.published_date,
+                    "url": chunk.source_url
                 }
                 for chunk in all_context
-                if chunk.get("title")
+                if chunk.title
             ]
-            yield f"data: {json.dumps({'type': 'citations', 'citations': citations})}\n\n"
+            yield sse("citations", citations=citations)
 
-        yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        yield DONE_FRAME
 
     except Exception as e:
         print(f"✗ Streaming error: {e}")
-        yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+        yield sse("error", error=str(e))
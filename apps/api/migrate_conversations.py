@@ -32,6 +32,11 @@ def migrate():
         else:
             print("✓ title column already exists")
 
+        # Ensure the session_id lookup index exists — every chat request
+        # resolves its conversation by session_id
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_conversations_session_id ON conversations(session_id)")
+        print("✓ session_id unique index in place")
+
         conn.commit()
         print("\n✅ Migration completed successfully!")
 
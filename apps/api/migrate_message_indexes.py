@@ -0,0 +1,35 @@
+"""
+Migration script to add message history indexes to existing databases
+"""
+import sqlite3
+import os
+
+DATABASE_PATH = os.getenv("DATABASE_URL", "sqlite:///./fiat_clarity.db").replace("sqlite:///", "")
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    try:
+        print("Adding message indexes...")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_messages_conv_role_created "
+            "ON messages(conversation_id, role, created_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_messages_conversation_id "
+            "ON messages(conversation_id)"
+        )
+        print("✓ Message indexes in place")
+
+        conn.commit()
+        print("\n✅ Migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
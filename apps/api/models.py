@@ -1,12 +1,60 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Float, Index
+from sqlalchemy import insert, text
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 import enum
 
+import orjson
+
 Base = declarative_base()
 
 
+class OrjsonText(TypeDecorator):
+    """JSON column backed by TEXT with orjson encode/decode.
+
+    Same stored format as the generic JSON type, but the per-row
+    serialize/deserialize runs through orjson's C codec instead of
+    stdlib json.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return orjson.dumps(value or {}).decode()
+
+    def process_result_value(self, value, dialect):
+        return orjson.loads(value) if value else {}
+
+
+# jsonb on Postgres (binary storage, containment operators, GIN
+# indexable); orjson-coded TEXT on the SQLite dev path
+MetadataJSON = OrjsonText().with_variant(JSONB(), "postgresql")
+
+class EmbeddingText(TypeDecorator):
+    """Embedding vector stored as a JSON-array TEXT (the SQLite path).
+
+    Serializes Python float lists on bind so callers hand the same row
+    dicts to both backends; results stay as the stored JSON string —
+    the vec_chunks triggers and the numpy fallback consume it directly.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return orjson.dumps(value).decode()
+
+
+# pgvector typed column on Postgres; JSON-string TEXT on SQLite, where
+# the sqlite-vec virtual table holds the searchable copy
+EmbeddingColumn = EmbeddingText().with_variant(Vector(1536), "postgresql")
+
+
 class DocumentStatus(str, enum.Enum):
     DRAFT = "draft"
     APPROVED = "approved"
@@ -25,10 +73,19 @@ class Document(Base):
     published_date = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    extra_data = Column(JSON, default={})
+    extra_data = Column(MetadataJSON, default=dict)
 
     chunks = relationship("Chunk", back_populates="document", cascade="all, delete-orphan")
 
+    # Retrieval only ever touches approved documents; the partial index
+    # keeps that join probe tiny regardless of draft/archived volume.
+    # SQLite ignores the partial predicate, so it also gets a plain
+    # (status, created_at) index for the approved listing.
+    __table_args__ = (
+        Index("ix_docs_approved", "id", postgresql_where=text("status = 'APPROVED'")),
+        Index("ix_docs_status_created", "status", "created_at"),
+    )
+
 
 class Chunk(Base):
     __tablename__ = "chunks"
@@ -38,21 +95,40 @@ class Chunk(Base):
     content = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     token_count = Column(Integer)
-    embedding = Column("embedding", String)  # pgvector type, stored as string in SQLAlchemy
+    embedding = Column(EmbeddingColumn)  # bind Python float lists on either backend
     created_at = Column(DateTime, default=datetime.utcnow)
 
     document = relationship("Document", back_populates="chunks")
 
+    # Covers the document join from both search paths
+    __table_args__ = (
+        Index("ix_chunks_doc_id", "document_id", "id"),
+    )
+
+    @classmethod
+    def bulk_insert(cls, session, rows):
+        """Insert chunk rows in one batched statement.
+
+        ``rows`` is an iterable of column dicts. Core insert with a list
+        parameter set goes through insertmanyvalues paging — a handful of
+        multi-row INSERTs instead of a round-trip per chunk.
+        """
+        rows = list(rows)
+        if rows:
+            session.execute(insert(cls), rows)
+
 
 class Conversation(Base):
     __tablename__ = "conversations"
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), unique=True, nullable=False, index=True)
+    user_id = Column(String(100), nullable=True, index=True)  # Browser fingerprint or user ID
+    title = Column(String(500), nullable=True)  # Auto-generated title from first message
     lead_id = Column(Integer, ForeignKey("leads.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    extra_data = Column(JSON, default={})
+    extra_data = Column(MetadataJSON, default=dict)
 
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
     lead = relationship("Lead", back_populates="conversations")
@@ -66,10 +142,19 @@ class Message(Base):
     role = Column(String(20), nullable=False)  # user, assistant, system
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    extra_data = Column(JSON, default={})  # citations, routing info, etc.
+    extra_data = Column(MetadataJSON, default=dict)  # citations, routing info, etc.
 
     conversation = relationship("Conversation", back_populates="messages")
 
+    # History fetches filter on (conversation_id, role) and order by
+    # created_at — the composite index serves them as a range scan with
+    # no sort; the single-column index covers plain per-conversation reads
+    __table_args__ = (
+        Index("ix_messages_conv_role_created", "conversation_id", "role", "created_at"),
+        Index("ix_messages_conversation_id", "conversation_id"),
+        Index("ix_messages_extra_data", "extra_data", postgresql_using="gin"),
+    )
+
 
 class Lead(Base):
     __tablename__ = "leads"
@@ -83,7 +168,7 @@ class Lead(Base):
     booking_url = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    extra_data = Column(JSON, default={})
+    extra_data = Column(MetadataJSON, default=dict)
 
     conversations = relationship("Conversation", back_populates="lead")
     consent_events = relationship("ConsentEvent", back_populates="lead", cascade="all, delete-orphan")
@@ -102,6 +187,6 @@ class ConsentEvent(Base):
     disclosure_text = Column(Text)
     disclosure_version = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
-    extra_data = Column(JSON, default={})
+    extra_data = Column(MetadataJSON, default=dict)
 
     lead = relationship("Lead", back_populates="consent_events")
@@ -1,112 +0,0 @@
-"""
-SQLite-compatible database models (no pgvector).
-"""
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from datetime import datetime
-import enum
-
-Base = declarative_base()
-
-
-class DocumentStatus(str, enum.Enum):
-    DRAFT = "draft"
-    APPROVED = "approved"
-    ARCHIVED = "archived"
-
-
-class Document(Base):
-    __tablename__ = "documents"
-
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(500), nullable=False)
-    source_url = Column(String(1000))
-    source_type = Column(String(100))
-    content = Column(Text, nullable=False)
-    status = Column(String(20), default="draft", nullable=False)
-    published_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    meta_data = Column("metadata", Text, default="{}")  # Store as JSON string
-
-    chunks = relationship("Chunk", back_populates="document", cascade="all, delete-orphan")
-
-
-class Chunk(Base):
-    __tablename__ = "chunks"
-
-    id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
-    content = Column(Text, nullable=False)
-    chunk_index = Column(Integer, nullable=False)
-    token_count = Column(Integer)
-    embedding = Column(Text)  # Store as JSON string
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-    document = relationship("Document", back_populates="chunks")
-
-
-class Conversation(Base):
-    __tablename__ = "conversations"
-
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(100), unique=True, nullable=False, index=True)
-    user_id = Column(String(100), nullable=True, index=True)  # Browser fingerprint or user ID
-    title = Column(String(500), nullable=True)  # Auto-generated title from first message
-    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    meta_data = Column("metadata", Text, default="{}")
-
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
-    lead = relationship("Lead", back_populates="conversations")
-
-
-class Message(Base):
-    __tablename__ = "messages"
-
-    id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
-    role = Column(String(20), nullable=False)
-    content = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    meta_data = Column("metadata", Text, default="{}")
-
-    conversation = relationship("Conversation", back_populates="messages")
-
-
-class Lead(Base):
-    __tablename__ = "leads"
-
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String(100), nullable=False)
-    email = Column(String(255), nullable=False, index=True)
-    phone = Column(String(50))
-    bucket = Column(String(50))
-    meeting_type = Column(String(50))
-    booking_url = Column(String(500))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    meta_data = Column("metadata", Text, default="{}")
-
-    conversations = relationship("Conversation", back_populates="lead")
-    consent_events = relationship("ConsentEvent", back_populates="lead", cascade="all, delete-orphan")
-
-
-class ConsentEvent(Base):
-    __tablename__ = "consent_events"
-
-    id = Column(Integer, primary_key=True, index=True)
-    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=True)
-    event_type = Column(String(50), nullable=False)
-    ip_address = Column(String(50))
-    user_agent = Column(String(500))
-    page_url = Column(String(1000))
-    disclosure_text = Column(Text)
-    disclosure_version = Column(String(50))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    meta_data = Column("metadata", Text, default="{}")
-
-    lead = relationship("Lead", back_populates="consent_events")
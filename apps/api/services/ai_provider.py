@@ -2,10 +2,17 @@
 AI provider abstraction layer.
 Supports OpenAI with graceful fallback to dev mode.
 """
+import asyncio
+import hashlib
 import os
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import AsyncIterator, List, Dict, Optional
 from dotenv import load_dotenv
 
+from services.dev_responses import match_topic_response, response_words
+from services.openai_http import pooled_http_client
+
 load_dotenv()
 
 
@@ -14,11 +21,17 @@ class AIProvider:
         self.api_key = os.getenv("OPENAI_API_KEY", "")
         self.dev_mode = os.getenv("DEV_MODE", "true").lower() == "true"
         self.client = None
+        self.async_client = None
 
         if self.api_key and not self.dev_mode:
             try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import AsyncOpenAI, OpenAI
+                self.client = OpenAI(api_key=self.api_key, http_client=pooled_http_client())
+                # Async sibling for the streaming generator
+                self.async_client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    http_client=pooled_http_client(asynchronous=True),
+                )
                 print("✓ OpenAI client initialized")
             except Exception as e:
                 print(f"⚠ OpenAI initialization failed: {e}. Running in DEV MODE.")
@@ -26,21 +39,78 @@ class AIProvider:
         else:
             print("ℹ Running in DEV MODE (no OpenAI API key)")
 
+        # Embedding LRU: users repeat and re-ask queries constantly, and
+        # each embedding call is a billable ~100ms round-trip. Keyed by a
+        # digest of the normalized text; lock because callers run on
+        # worker threads.
+        self._embed_cache = OrderedDict()
+        self._embed_cache_lock = Lock()
+        self._embed_cache_max = 4096
+
+        # The system prompt rarely changes between requests; reuse the
+        # same message dict instead of allocating one per call
+        self._system_msg_cache: Dict[str, Dict[str, str]] = {}
+
     def generate_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding for text. Returns None in dev mode."""
         if self.dev_mode or not self.client:
             return None
 
+        key = hashlib.blake2b(text.strip().lower().encode(), digest_size=16).digest()
+        with self._embed_cache_lock:
+            cached = self._embed_cache.get(key)
+            if cached is not None:
+                self._embed_cache.move_to_end(key)
+                return cached
+
         try:
             response = self.client.embeddings.create(
                 model="text-embedding-3-small",
                 input=text
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
         except Exception as e:
             print(f"Error generating embedding: {e}")
             return None
 
+        with self._embed_cache_lock:
+            self._embed_cache[key] = embedding
+            self._embed_cache.move_to_end(key)
+            while len(self._embed_cache) > self._embed_cache_max:
+                self._embed_cache.popitem(last=False)
+
+        return embedding
+
+    def generate_embeddings_batch(self, texts: List[str], batch: int = 256) -> List[Optional[List[float]]]:
+        """Generate embeddings for many texts in a few API calls.
+
+        The embeddings endpoint accepts a list input and returns vectors
+        in order, so N chunks cost ceil(N/batch) HTTP round-trips instead
+        of N. Oversized inputs are paged ``batch`` at a time to stay well
+        under the endpoint's input cap. Returns a list of Nones in dev
+        mode (same shape as the input); a failed page yields Nones for
+        just that page.
+        """
+        if self.dev_mode or not self.client or not texts:
+            return [None] * len(texts)
+
+        embeddings: List[Optional[List[float]]] = []
+        for start in range(0, len(texts), batch):
+            page = texts[start:start + batch]
+            try:
+                response = self.client.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=page
+                )
+                # Order is guaranteed to match the input, but sort by index
+                # defensively since we rely on positional alignment
+                embeddings.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+            except Exception as e:
+                print(f"Error generating batch embeddings: {e}")
+                embeddings.extend([None] * len(page))
+
+        return embeddings
+
     def generate_chat_response(
         self,
         messages: List[Dict[str, str]],
@@ -55,24 +125,7 @@ class AIProvider:
             return self._dev_mode_response(messages, context_chunks)
 
         try:
-            # Build context from chunks
-            context_text = "\n\n".join([
-                f"[{chunk.get('title', 'Unknown')}]\n{chunk.get('content', '')}"
-                for chunk in context_chunks
-            ])
-
-            # Build messages with context
-            augmented_messages = [
-                {"role": "system", "content": system_prompt}
-            ]
-
-            if context_text:
-                augmented_messages.append({
-                    "role": "system",
-                    "content": f"KNOWLEDGE BASE CONTEXT:\n\n{context_text}"
-                })
-
-            augmented_messages.extend(messages)
+            augmented_messages = self._augment_messages(messages, context_chunks, system_prompt)
 
             response = self.client.chat.completions.create(
                 model=model,
@@ -87,33 +140,87 @@ class AIProvider:
             print(f"Error generating chat response: {e}")
             return self._dev_mode_response(messages, context_chunks)
 
+    async def generate_chat_response_stream(
+        self,
+        messages: List[Dict[str, str]],
+        context_chunks: List,
+        system_prompt: str,
+        model: str = "gpt-4-turbo-preview",
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """Yield response text deltas as they arrive.
+
+        Streaming sibling of generate_chat_response: callers see the
+        first token at time-to-first-token instead of waiting for the
+        whole completion. Dev mode replays the canned response word by
+        word, mirroring AssistantsProvider.
+        """
+        if self.dev_mode or not self.async_client:
+            response = self._dev_mode_response(messages, context_chunks)
+            for word in response_words(response):
+                yield word
+                await asyncio.sleep(0.05)
+            return
+
+        augmented_messages = self._augment_messages(messages, context_chunks, system_prompt)
+        stream = await self.async_client.chat.completions.create(
+            model=model,
+            messages=augmented_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def _augment_messages(
+        self,
+        messages: List[Dict[str, str]],
+        context_chunks: List,
+        system_prompt: str
+    ) -> List[Dict[str, str]]:
+        """Assemble system prompt + knowledge context + history."""
+        # Build context from chunks — generator feed, no intermediate
+        # list; slotted RagChunk attribute reads, no dict probing
+        context_text = "\n\n".join(
+            f"[{chunk.title}]\n{chunk.content}"
+            for chunk in context_chunks
+        )
+
+        system_msg = self._system_msg_cache.get(system_prompt)
+        if system_msg is None:
+            if len(self._system_msg_cache) >= 4:
+                self._system_msg_cache.clear()
+            system_msg = {"role": "system", "content": system_prompt}
+            self._system_msg_cache[system_prompt] = system_msg
+        augmented_messages = [system_msg]
+
+        if context_text:
+            augmented_messages.append({
+                "role": "system",
+                "content": f"KNOWLEDGE BASE CONTEXT:\n\n{context_text}"
+            })
+
+        augmented_messages.extend(messages)
+        return augmented_messages
+
     def _dev_mode_response(self, messages: List[Dict[str, str]], context_chunks: List[Dict]) -> str:
         """Generate deterministic dev mode response."""
-        user_message = messages[-1]["content"].lower() if messages else ""
+        user_message = messages[-1]["content"] if messages else ""
 
         # Build citations from context
         citations = []
         if context_chunks:
-            citations = [f"- {chunk.get('title', 'Document')} ({chunk.get('published_date', 'N/A')})"
+            citations = [f"- {chunk.title or 'Document'} ({chunk.published_date or 'N/A'})"
                         for chunk in context_chunks[:2]]
 
         citation_text = "\n".join(citations) if citations else ""
 
         # Topic-based responses - Keep them short and concise
-        if "roth" in user_message or "conversion" in user_message:
-            response = """A Roth conversion moves money from a traditional IRA to a Roth IRA. You pay taxes now, but get tax-free growth and withdrawals later. It often makes sense if you expect higher taxes in retirement or want to avoid RMDs.
-
-Want me to explain tax strategies, timing considerations, or walk through an example?"""
-
-        elif "social security" in user_message or "timing" in user_message:
-            response = """You can claim Social Security between ages 62-70. Claiming at 62 gets you reduced benefits but more years of payments. Waiting until 70 maximizes your monthly benefit (8% more per year you delay).
-
-The right choice depends on your health, financial needs, and other income sources. Want to discuss break-even ages or specific scenarios?"""
-
-        else:
-            response = """I can help with retirement planning questions like Social Security timing, Roth conversions, tax strategies, withdrawal rates, and Medicare planning.
-
-What specific aspect would you like to explore?"""
+        response = match_topic_response(user_message)
 
         # Add citations if available
         if citation_text:
@@ -2,11 +2,15 @@
 OpenAI Assistants API provider with Clarity Storage integration.
 Uses your existing OpenAI project with vector store and custom prompt.
 """
+import asyncio
 import os
-import time
-from typing import List, Dict, Optional, Iterator
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Dict, Optional
 from dotenv import load_dotenv
 
+from services.dev_responses import match_topic_response, response_words
+from services.openai_http import pooled_http_client
+
 load_dotenv()
 
 
@@ -24,22 +28,39 @@ class AssistantsProvider:
 
         if self.api_key and not self.dev_mode:
             try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
-
-                # Use existing assistant or create new one
-                if self.assistant_id:
-                    try:
-                        self.assistant = self.client.beta.assistants.retrieve(self.assistant_id)
-                        print(f"✓ Using existing assistant: {self.assistant.id}")
-                    except:
-                        print("⚠ Assistant ID not found, will create new one")
-                        self.assistant = None
-
-                if not self.assistant:
-                    self.assistant = self._create_assistant()
-                    print(f"✓ Created new assistant: {self.assistant.id}")
-                    print(f"  Add to .env: OPENAI_ASSISTANT_ID={self.assistant.id}")
+                from openai import AsyncOpenAI, OpenAI
+
+                # Request traffic goes through the async client so streaming
+                # runs never block the event loop; completions multiplex over
+                # the shared httpx pool
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    http_client=pooled_http_client(asynchronous=True),
+                )
+
+                # Use existing assistant or create new one. Only the id is
+                # used downstream, so a pre-verified id (see
+                # verify_assistant.py) skips the per-process retrieve
+                # round-trip on cold start.
+                if self.assistant_id and os.getenv("OPENAI_ASSISTANT_VERIFIED", "") == "1":
+                    self.assistant = SimpleNamespace(id=self.assistant_id)
+                    print(f"✓ Using verified assistant: {self.assistant_id}")
+                else:
+                    # Boot-time setup only — a throwaway sync client keeps
+                    # __init__ synchronous
+                    setup_client = OpenAI(api_key=self.api_key)
+                    if self.assistant_id:
+                        try:
+                            self.assistant = setup_client.beta.assistants.retrieve(self.assistant_id)
+                            print(f"✓ Using existing assistant: {self.assistant.id}")
+                        except:
+                            print("⚠ Assistant ID not found, will create new one")
+                            self.assistant = None
+
+                    if not self.assistant:
+                        self.assistant = self._create_assistant(setup_client)
+                        print(f"✓ Created new assistant: {self.assistant.id}")
+                        print(f"  Add to .env: OPENAI_ASSISTANT_ID={self.assistant.id}")
 
             except Exception as e:
                 print(f"⚠ OpenAI initialization failed: {e}. Running in DEV MODE.")
@@ -47,7 +68,7 @@ class AssistantsProvider:
         else:
             print("ℹ Running in DEV MODE (no OpenAI API key)")
 
-    def _create_assistant(self):
+    def _create_assistant(self, client):
         """Create a new assistant with Clarity configuration."""
         tools = [{"type": "file_search"}]
 
@@ -113,41 +134,42 @@ Remember: You're here to educate and clarify — not to replace human guidance."
                 }
             }
 
-        return self.client.beta.assistants.create(**config)
+        return client.beta.assistants.create(**config)
 
-    def generate_streaming_response(
+    async def generate_streaming_response(
         self,
         messages: List[Dict[str, str]],
         thread_id: Optional[str] = None
-    ) -> Iterator[Dict]:
+    ) -> AsyncIterator[Dict]:
         """
         Generate streaming chat response using Assistants API.
         Yields events as they come in.
         """
         if self.dev_mode or not self.client or not self.assistant:
-            yield from self._dev_mode_streaming(messages)
+            async for event in self._dev_mode_streaming(messages):
+                yield event
             return
 
         try:
             # Create or use existing thread
             if not thread_id:
-                thread = self.client.beta.threads.create()
+                thread = await self.client.beta.threads.create()
                 thread_id = thread.id
 
             # Add user message
             user_message = messages[-1]["content"]
-            self.client.beta.threads.messages.create(
+            await self.client.beta.threads.messages.create(
                 thread_id=thread_id,
                 role="user",
                 content=user_message
             )
 
             # Stream the response
-            with self.client.beta.threads.runs.stream(
+            async with self.client.beta.threads.runs.stream(
                 thread_id=thread_id,
                 assistant_id=self.assistant.id,
             ) as stream:
-                for event in stream:
+                async for event in stream:
                     # Text delta events
                     if event.event == "thread.message.delta":
                         for content in event.data.delta.content:
@@ -161,7 +183,7 @@ Remember: You're here to educate and clarify — not to replace human guidance."
                     # Completed event
                     elif event.event == "thread.run.completed":
                         # Get final message for citations
-                        messages = self.client.beta.threads.messages.list(
+                        messages = await self.client.beta.threads.messages.list(
                             thread_id=thread_id,
                             order="desc",
                             limit=1
@@ -207,34 +229,18 @@ Remember: You're here to educate and clarify — not to replace human guidance."
                 })
         return citations
 
-    def _dev_mode_streaming(self, messages: List[Dict[str, str]]) -> Iterator[Dict]:
+    async def _dev_mode_streaming(self, messages: List[Dict[str, str]]) -> AsyncIterator[Dict]:
         """Generate streaming dev mode response."""
-        user_message = messages[-1]["content"].lower() if messages else ""
-
-        # Topic-based responses
-        if "roth" in user_message or "conversion" in user_message:
-            response = """A Roth conversion moves money from a traditional IRA to a Roth IRA. You pay taxes now, but get tax-free growth and withdrawals later. It often makes sense if you expect higher taxes in retirement or want to avoid RMDs.
-
-Want me to explain tax strategies, timing considerations, or walk through an example?"""
+        user_message = messages[-1]["content"] if messages else ""
 
-        elif "social security" in user_message or "timing" in user_message:
-            response = """You can claim Social Security between ages 62-70. Claiming at 62 gets you reduced benefits but more years of payments. Waiting until 70 maximizes your monthly benefit (8% more per year you delay).
+        # Topic-based responses — the word tuples are tokenized once per
+        # canned response, and the pacing sleep yields the event loop
+        # instead of blocking the worker for the whole playback
+        response = match_topic_response(user_message)
 
-The right choice depends on your health, financial needs, and other income sources. Want to discuss break-even ages or specific scenarios?"""
-
-        else:
-            response = """I can help with retirement planning questions like Social Security timing, Roth conversions, tax strategies, withdrawal rates, and Medicare planning.
-
-What specific aspect would you like to explore?"""
-
-        # Stream the response word by word
-        words = response.split()
-        for i, word in enumerate(words):
-            yield {
-                "type": "content",
-                "content": word + (" " if i < len(words) - 1 else "")
-            }
-            time.sleep(0.05)  # Simulate streaming
+        for word in response_words(response):
+            yield {"type": "content", "content": word}
+            await asyncio.sleep(0.05)  # Simulate streaming
 
         yield {"type": "done"}
 
@@ -0,0 +1,63 @@
+"""
+Shared dev-mode topic routing and canned responses.
+
+Both providers previously ran a chain of `"keyword" in message`
+substring scans (one full pass over the message per keyword) against
+their own copies of the response text. A single precompiled alternation
+scans the message once and collects every matched bucket; with this
+handful of literal keywords that beats pulling in a dedicated
+Aho-Corasick dependency.
+"""
+import re
+from functools import lru_cache
+
+ROTH_RESPONSE = """A Roth conversion moves money from a traditional IRA to a Roth IRA. You pay taxes now, but get tax-free growth and withdrawals later. It often makes sense if you expect higher taxes in retirement or want to avoid RMDs.
+
+Want me to explain tax strategies, timing considerations, or walk through an example?"""
+
+SOCIAL_SECURITY_RESPONSE = """You can claim Social Security between ages 62-70. Claiming at 62 gets you reduced benefits but more years of payments. Waiting until 70 maximizes your monthly benefit (8% more per year you delay).
+
+The right choice depends on your health, financial needs, and other income sources. Want to discuss break-even ages or specific scenarios?"""
+
+DEFAULT_RESPONSE = """I can help with retirement planning questions like Social Security timing, Roth conversions, tax strategies, withdrawal rates, and Medicare planning.
+
+What specific aspect would you like to explore?"""
+
+_TOPIC_BUCKETS = {
+    "roth": "roth",
+    "conversion": "roth",
+    "social security": "social_security",
+    "timing": "social_security",
+}
+_TOPIC_RE = re.compile("|".join(map(re.escape, _TOPIC_BUCKETS)))
+
+_RESPONSES = {
+    "roth": ROTH_RESPONSE,
+    "social_security": SOCIAL_SECURITY_RESPONSE,
+}
+
+# Mirrors the old if/elif chain: roth wins over social security when a
+# message mentions both, regardless of which keyword appears first
+_TOPIC_PRIORITY = ("roth", "social_security")
+
+
+def match_topic_response(user_message: str) -> str:
+    """Pick the canned response for a message with one scan over it."""
+    buckets = {
+        _TOPIC_BUCKETS[m.group(0)]
+        for m in _TOPIC_RE.finditer(user_message.lower())
+    }
+    for bucket in _TOPIC_PRIORITY:
+        if bucket in buckets:
+            return _RESPONSES[bucket]
+    return DEFAULT_RESPONSE
+
+
+@lru_cache(maxsize=8)
+def response_words(response: str) -> tuple:
+    """Tokenize a canned response once; dev streaming replays the tuple."""
+    words = response.split()
+    return tuple(
+        word + (" " if i < len(words) - 1 else "")
+        for i, word in enumerate(words)
+    )
@@ -0,0 +1,24 @@
+"""
+Shared httpx pool configuration for OpenAI SDK clients.
+
+Every provider hands its SDK client an explicitly sized httpx pool so
+concurrent chat traffic multiplexes over a few keep-alive connections
+(HTTP/2 streams when the h2 extra is installed) instead of opening a
+fresh TLS session per burst.
+"""
+import httpx
+
+_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+
+
+def pooled_http_client(asynchronous: bool = False):
+    """Build an httpx client with the shared pool limits.
+
+    Falls back to HTTP/1.1 keep-alive pooling when the ``h2`` package
+    (the ``httpx[http2]`` extra) is not installed.
+    """
+    cls = httpx.AsyncClient if asynchronous else httpx.Client
+    try:
+        return cls(http2=True, limits=_LIMITS)
+    except ImportError:
+        return cls(limits=_LIMITS)
@@ -2,21 +2,141 @@
 RAG (Retrieval-Augmented Generation) service.
 Handles semantic search and retrieval from approved documents.
 """
-from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+import struct
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterator, List, Optional
+
+import numpy as np
+import orjson
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import bindparam, select, text
+from pgvector.sqlalchemy import Vector
 
-# Import PostgreSQL models
 from models import Document, Chunk, DocumentStatus
 
 from services.ai_provider import ai_provider
 
 
+@dataclass(frozen=True, slots=True)
+class RagChunk:
+    """One retrieval result, from the database or the site scraper.
+
+    Slotted and frozen: attribute reads skip the per-instance dict a
+    plain dict result would allocate, and results can be cached and
+    shared across requests safely.
+    """
+    content: str
+    title: str
+    source_url: Optional[str] = None
+    published_date: Optional[str] = None
+    similarity: float = 0.0
+    id: Optional[int] = None
+    chunk_index: Optional[int] = None
+
+
+def _published_str(value) -> Optional[str]:
+    """Normalize a published_date (datetime or SQLite ISO string) to YYYY-MM-DD."""
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        # isoformat() skips libc strftime formatting; slice off any time part
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+def _row_chunk(row, similarity: float) -> RagChunk:
+    """Build a RagChunk from the standard 6-column search row shape."""
+    return RagChunk(
+        id=row[0],
+        content=row[1],
+        chunk_index=row[2],
+        title=row[3],
+        source_url=row[4],
+        published_date=_published_str(row[5]),
+        similarity=similarity,
+    )
+
+
+class _EmbeddingMatrix:
+    """Lazy in-memory copy of approved-chunk embeddings.
+
+    Backs the NumPy similarity fallback. Rows are L2-normalized on load,
+    then symmetrically quantized to int8 with a per-row scale: a quarter
+    of the float32 memory traffic on the scan for ~1% recall cost, with
+    the dot product accumulated in int32. Process-wide because RAGService
+    is constructed per request.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._ids = None
+        self._matrix = None
+        self._scales = None
+
+    def get(self, db):
+        with self._lock:
+            if self._matrix is None:
+                self._load(db)
+            return self._ids, self._matrix, self._scales
+
+    def invalidate(self):
+        with self._lock:
+            self._ids = None
+            self._matrix = None
+            self._scales = None
+
+    def _load(self, db):
+        rows = db.execute(
+            text(
+                "SELECT c.id, c.embedding FROM chunks c "
+                "JOIN documents d ON d.id = c.document_id "
+                "WHERE c.embedding IS NOT NULL AND d.status = :status"
+            ),
+            # Stored enum name, since raw SQL skips the column's coercion
+            {"status": DocumentStatus.APPROVED.name},
+        )
+
+        ids, vectors = [], []
+        for chunk_id, raw in rows:
+            if isinstance(raw, (str, bytes)):
+                # Text columns (SQLite) and unregistered pgvector both
+                # come back as "[...]", which parses as JSON
+                raw = orjson.loads(raw)
+            ids.append(chunk_id)
+            vectors.append(raw)
+
+        if not ids:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._matrix = np.empty((0, 1536), dtype=np.int8)
+            self._scales = np.empty(0, dtype=np.float32)
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        row_max = np.abs(matrix).max(axis=1)
+        row_max[row_max == 0] = 1.0
+        self._matrix = np.round(matrix / row_max[:, None] * 127.0).astype(np.int8)
+        self._scales = (row_max / 127.0).astype(np.float32)
+        self._ids = np.asarray(ids, dtype=np.int64)
+
+
+_embedding_matrix = _EmbeddingMatrix()
+
+
 class RAGService:
     def __init__(self, db: Session):
         self.db = db
 
-    def retrieve_relevant_chunks(self, query: str, limit: int = 3) -> List[Dict]:
+    @staticmethod
+    def invalidate_embedding_cache():
+        """Drop the cached fallback matrix after ingest/approval changes."""
+        _embedding_matrix.invalidate()
+
+    def retrieve_relevant_chunks(self, query: str, limit: int = 3) -> List[RagChunk]:
         """
         Retrieve most relevant chunks for a query.
         Uses vector similarity in production, keyword search in dev mode.
@@ -30,13 +150,15 @@ class RAGService:
             # Fallback to keyword search in dev mode
             return self._keyword_search(query, limit)
 
-    def _vector_search(self, embedding: List[float], limit: int) -> List[Dict]:
-        """Semantic search using pgvector."""
-        try:
-            # Convert embedding to pgvector format
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+    def _vector_search(self, embedding: List[float], limit: int) -> List[RagChunk]:
+        """Semantic search using pgvector (or sqlite-vec on SQLite)."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return self._vector_search_sqlite(embedding, limit)
 
-            # Query using cosine similarity
+        try:
+            # Query using cosine similarity. The typed bindparam lets the
+            # pgvector adapter serialize the query vector itself — no
+            # per-query float->str join in Python, no server-side cast.
             sql = text("""
                 SELECT
                     c.id,
@@ -45,45 +167,201 @@ class RAGService:
                     d.title,
                     d.source_url,
                     d.published_date,
-                    1 - (c.embedding <=> :embedding::vector) as similarity
+                    1 - (c.embedding <=> :embedding) as similarity
                 FROM chunks c
                 JOIN documents d ON c.document_id = d.id
                 WHERE d.status = :status
                 AND c.embedding IS NOT NULL
-                ORDER BY c.embedding <=> :embedding::vector
+                ORDER BY c.embedding <=> :embedding
+                LIMIT :limit
+            """).bindparams(bindparam("embedding", type_=Vector(1536)))
+
+            result = self.db.execute(
+                sql,
+                {
+                    "embedding": embedding,
+                    # Raw SQL, so bind the stored enum name, not .value
+                    "status": DocumentStatus.APPROVED.name,
+                    "limit": limit
+                }
+            )
+
+            return [_row_chunk(row, float(row[6])) for row in result]
+
+        except Exception as e:
+            print(f"Vector search error: {e}")
+            # The failed statement poisons the transaction; clear it so
+            # the fallbacks can query
+            self.db.rollback()
+            return self._numpy_search(embedding, limit) or self._keyword_search("", limit)
+
+    def _vector_search_sqlite(self, embedding: List[float], limit: int) -> List[RagChunk]:
+        """KNN via the sqlite-vec vec_chunks virtual table.
+
+        The query vector is bound as packed float32 bytes; distances are
+        cosine (the table is declared distance_metric=cosine), matching
+        the pgvector path's 1 - distance similarity. Over-fetches a few
+        neighbors since the status filter runs after the KNN.
+        """
+        try:
+            sql = text("""
+                SELECT
+                    c.id,
+                    c.content,
+                    c.chunk_index,
+                    d.title,
+                    d.source_url,
+                    d.published_date,
+                    1 - v.distance as similarity
+                FROM (
+                    SELECT chunk_id, distance
+                    FROM vec_chunks
+                    WHERE embedding MATCH :embedding AND k = :k
+                ) v
+                JOIN chunks c ON c.id = v.chunk_id
+                JOIN documents d ON d.id = c.document_id
+                WHERE d.status = :status
+                ORDER BY v.distance
                 LIMIT :limit
             """)
 
             result = self.db.execute(
                 sql,
                 {
-                    "embedding": embedding_str,
-                    "status": DocumentStatus.APPROVED.value,
+                    "embedding": struct.pack(f"{len(embedding)}f", *embedding),
+                    "k": limit * 4,
+                    # Raw SQL, so bind the stored enum name, not .value
+                    "status": DocumentStatus.APPROVED.name,
                     "limit": limit
                 }
             )
 
-            chunks = []
-            for row in result:
-                chunks.append({
-                    "id": row[0],
-                    "content": row[1],
-                    "chunk_index": row[2],
-                    "title": row[3],
-                    "source_url": row[4],
-                    "published_date": row[5].strftime("%Y-%m-%d") if row[5] else None,
-                    "similarity": float(row[6])
-                })
+            return [_row_chunk(row, float(row[6])) for row in result]
+
+        except Exception as e:
+            print(f"Vector search error: {e}")
+            # vec_chunks missing or extension unavailable
+            self.db.rollback()
+            return self._numpy_search(embedding, limit) or self._keyword_search("", limit)
+
+    def _numpy_search(self, embedding: List[float], limit: int) -> List[RagChunk]:
+        """In-memory cosine similarity when the SQL vector path fails.
+
+        Reuses the already-paid-for query embedding: scores every chunk
+        with one BLAS matrix-vector product over the cached normalized
+        matrix, then fetches just the top rows by id.
+        """
+        try:
+            ids, matrix, scales = _embedding_matrix.get(self.db)
+            if not len(ids):
+                return []
+
+            q = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(q)
+            if norm:
+                q /= norm
+
+            # Quantize the query the same way as the rows; int8·int8
+            # dots accumulate safely in int32 (127²·1536 < 2³¹)
+            q_max = float(np.abs(q).max()) or 1.0
+            q_int = np.round(q / q_max * 127.0).astype(np.int8)
+            scores = np.matmul(matrix, q_int, dtype=np.int32).astype(np.float32)
+            scores *= scales * (q_max / 127.0)
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            similarity = {int(ids[i]): float(scores[i]) for i in top}
+
+            rows = self.db.execute(
+                text(
+                    "SELECT c.id, c.content, c.chunk_index, d.title, "
+                    "d.source_url, d.published_date "
+                    "FROM chunks c JOIN documents d ON c.document_id = d.id "
+                    "WHERE c.id IN :ids"
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": list(similarity)},
+            )
 
+            chunks = [_row_chunk(row, similarity[row[0]]) for row in rows]
+            chunks.sort(key=lambda chunk: chunk.similarity, reverse=True)
             return chunks
 
         except Exception as e:
-            print(f"Vector search error: {e}")
-            # Fallback to keyword search
-            return self._keyword_search("", limit)
+            print(f"NumPy fallback search error: {e}")
+            return []
+
+    def _keyword_search(self, query: str, limit: int) -> List[RagChunk]:
+        """Fallback keyword search when embeddings unavailable.
 
-    def _keyword_search(self, query: str, limit: int) -> List[Dict]:
-        """Fallback keyword search when embeddings unavailable."""
+        Prefers the full-text index (tsvector on Postgres, FTS5 on
+        SQLite); the old ILIKE scan remains as a last resort for
+        databases initialized before the index existed.
+        """
+        if query.strip():
+            try:
+                chunks = self._fts_search(query, limit)
+                if chunks:
+                    return chunks
+            except Exception as e:
+                print(f"FTS search error: {e}")
+        return self._like_search(query, limit)
+
+    def _fts_search(self, query: str, limit: int) -> List[RagChunk]:
+        """Indexed full-text search over chunk content."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            sql = text("""
+                SELECT
+                    c.id,
+                    c.content,
+                    c.chunk_index,
+                    d.title,
+                    d.source_url,
+                    d.published_date
+                FROM chunks c
+                JOIN documents d ON c.document_id = d.id
+                WHERE d.status = :status
+                AND c.content_tsv @@ plainto_tsquery('english', :query)
+                ORDER BY ts_rank(c.content_tsv, plainto_tsquery('english', :query)) DESC
+                LIMIT :limit
+            """)
+            params = {"query": query}
+        else:
+            sql = text("""
+                SELECT
+                    c.id,
+                    c.content,
+                    c.chunk_index,
+                    d.title,
+                    d.source_url,
+                    d.published_date
+                FROM chunks_fts f
+                JOIN chunks c ON c.id = f.rowid
+                JOIN documents d ON c.document_id = d.id
+                WHERE d.status = :status
+                AND chunks_fts MATCH :query
+                ORDER BY bm25(chunks_fts)
+                LIMIT :limit
+            """)
+            # Quote each term so user punctuation can't break MATCH syntax
+            params = {
+                "query": " ".join(
+                    '"{}"'.format(word.replace('"', ""))
+                    for word in query.split()
+                )
+            }
+
+        result = self.db.execute(
+            sql,
+            # Enum(DocumentStatus) stores the member *name* ('APPROVED');
+            # raw SQL bypasses the column's coercion, so bind the name
+            {**params, "status": DocumentStatus.APPROVED.name, "limit": limit}
+        )
+
+        # 0.5 similarity: placeholder rank, as before
+        return [_row_chunk(row, 0.5) for row in result]
+
+    def _like_search(self, query: str, limit: int) -> List[RagChunk]:
+        """Unindexed ILIKE fallback (pre-FTS databases and empty queries)."""
         try:
             keywords = query.lower().split()
             if not keywords:
@@ -91,6 +369,7 @@ class RAGService:
                 results = (
                     self.db.query(Chunk, Document)
                     .join(Document)
+                    .options(contains_eager(Chunk.document))
                     .filter(Document.status == DocumentStatus.APPROVED)
                     .order_by(Document.created_at.desc())
                     .limit(limit)
@@ -102,6 +381,7 @@ class RAGService:
                 results = (
                     self.db.query(Chunk, Document)
                     .join(Document)
+                    .options(contains_eager(Chunk.document))
                     .filter(Document.status == DocumentStatus.APPROVED)
                     .filter(Chunk.content.ilike(search_pattern))
                     .order_by(Document.created_at.desc())
@@ -109,29 +389,78 @@ class RAGService:
                     .all()
                 )
 
-            chunks = []
-            for chunk, doc in results:
-                chunks.append({
-                    "id": chunk.id,
-                    "content": chunk.content,
-                    "chunk_index": chunk.chunk_index,
-                    "title": doc.title,
-                    "source_url": doc.source_url,
-                    "published_date": doc.published_date.strftime("%Y-%m-%d") if doc.published_date else None,
-                    "similarity": 0.5  # Placeholder
-                })
-
-            return chunks
+            return [
+                RagChunk(
+                    id=chunk.id,
+                    content=chunk.content,
+                    chunk_index=chunk.chunk_index,
+                    title=doc.title,
+                    source_url=doc.source_url,
+                    published_date=_published_str(doc.published_date),
+                    similarity=0.5,  # Placeholder
+                )
+                for chunk, doc in results
+            ]
 
         except Exception as e:
             print(f"Keyword search error: {e}")
             return []
 
-    def get_approved_documents(self) -> List[Document]:
-        """Get all approved documents."""
-        return (
-            self.db.query(Document)
-            .filter(Document.status == DocumentStatus.APPROVED)
+    def get_approved_documents(self) -> Iterator:
+        """Stream (id, title, source_url, published_date) for approved documents.
+
+        Projects just the listing columns and pages the cursor with
+        yield_per so a large catalog never pulls its document bodies
+        into memory at once.
+        """
+        stmt = (
+            select(Document.id, Document.title, Document.source_url, Document.published_date)
+            .where(Document.status == DocumentStatus.APPROVED)
             .order_by(Document.created_at.desc())
-            .all()
+            .execution_options(yield_per=500)
         )
+        return self.db.execute(stmt)
+
+
+if __name__ == "__main__":
+    # Run from apps/api as: python -m services.rag_service
+    # Regression smoke for the status filters: every search path must
+    # return a document approved through the ORM (the raw SQL once bound
+    # the enum value while the column stores the name, so all three
+    # shipped returning zero rows)
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from models import Base
+
+    _engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(_engine)
+    with _engine.connect() as _conn:
+        _conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE chunks_fts USING fts5(content, content='chunks', content_rowid='id')"
+        )
+        _conn.commit()
+
+    _db = sessionmaker(bind=_engine)()
+    _doc = Document(title="Roth guide", content="body", status=DocumentStatus.APPROVED)
+    _db.add(_doc)
+    _db.flush()
+    _db.add(Chunk(
+        document_id=_doc.id,
+        content="A roth conversion moves pre-tax money into a Roth IRA",
+        chunk_index=0,
+        embedding=[1.0] + [0.0] * 1535,
+    ))
+    _db.commit()
+    _db.execute(text("INSERT INTO chunks_fts(rowid, content) SELECT id, content FROM chunks"))
+    _db.commit()
+
+    _svc = RAGService(_db)
+    assert _svc._fts_search("roth conversion", 3), "FTS search missed the approved chunk"
+    assert _svc._keyword_search("roth conversion", 3), "keyword search missed the approved chunk"
+    assert _svc._like_search("roth", 3), "ILIKE search missed the approved chunk"
+    _embedding_matrix.invalidate()
+    assert _svc._numpy_search([1.0] + [0.0] * 1535, 3), "numpy search missed the approved chunk"
+    print("✓ rag_service smoke test passed")
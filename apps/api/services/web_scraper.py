@@ -1,23 +1,70 @@
 """
 Web scraper service to fetch content from fiatwm.com
 """
+import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
 from typing import List, Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    # lxml parses in C structs — several times faster than BeautifulSoup's
+    # pure-Python html.parser and far lighter on peak memory
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+    from bs4 import BeautifulSoup
+    logger.info("lxml not installed; falling back to BeautifulSoup parsing")
+
 
 class WebScraperService:
     """Service for scraping content from fiatwm.com"""
 
     def __init__(self):
         self.base_url = "https://fiatwm.com"
+        # One Session for the process: keep-alive + TLS session reuse means
+        # repeat fetches to fiatwm.com skip the TCP/TLS handshake entirely.
+        # Callers run this off the event loop (asyncio.to_thread / the
+        # retrieval pool in main.py), so the sync API is fine here.
         self.session = requests.Session()
+        # Pool sized above the fetch fan-out so concurrent search_site
+        # calls never queue on a connection slot; a short retry absorbs
+        # transient resets without stalling the caller.
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.1),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        # Fetch fan-out pool for search_site: the candidate pages are
+        # independent network I/O, so wall time is the slowest fetch
+        self._fetch_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="scraper")
+        # TTL'd LRU over search results keyed by normalized query: repeat
+        # and near-repeat questions skip the whole fetch fan-out. Guarded
+        # by a lock since callers run on worker threads.
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = Lock()
+        self._search_cache_ttl = 300.0
+        self._search_cache_max = 1024
+        # Page-level TTL cache: the handful of candidate URLs rarely
+        # change, so a warm entry turns a scrape into a dict lookup.
+        # Longer TTL than the search cache since pages churn less than
+        # query mixes do.
+        self._page_cache = OrderedDict()
+        self._page_cache_lock = Lock()
+        self._page_cache_ttl = 600.0
+        self._page_cache_max = 32
 
     def scrape_page(self, url: str) -> Optional[Dict[str, str]]:
         """
@@ -29,41 +76,88 @@ class WebScraperService:
         Returns:
             Dictionary with title and content, or None if failed
         """
+        now = monotonic()
+        with self._page_cache_lock:
+            entry = self._page_cache.get(url)
+            if entry and now - entry[0] < self._page_cache_ttl:
+                self._page_cache.move_to_end(url)
+                return entry[1]
+
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if lxml_html is not None:
+                page = self._extract_lxml(url, response.content)
+            else:
+                page = self._extract_bs4(url, response.content)
 
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer"]):
-                script.decompose()
+        except Exception as e:
+            logger.error(f"Error scraping {url}: {e}")
+            return None
 
-            # Get title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else url
+        # Cache only successes so transient fetch failures get retried
+        if page is not None:
+            with self._page_cache_lock:
+                self._page_cache[url] = (now, page)
+                self._page_cache.move_to_end(url)
+                while len(self._page_cache) > self._page_cache_max:
+                    self._page_cache.popitem(last=False)
 
-            # Get main content
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
+        return page
 
-            if main_content:
-                # Extract text
-                text = main_content.get_text(separator='\n', strip=True)
-                # Clean up excessive whitespace
-                text = '\n'.join([line.strip() for line in text.split('\n') if line.strip()])
+    def _extract_lxml(self, url: str, payload: bytes) -> Optional[Dict[str, str]]:
+        """Extract title + main text with lxml (C-level tree, no Python nodes)."""
+        tree = lxml_html.fromstring(payload)
 
-                return {
-                    'url': url,
-                    'title': title_text,
-                    'content': text[:5000]  # Limit to first 5000 chars
-                }
+        for tag in tree.xpath('//script|//style|//nav|//footer'):
+            tag.getparent().remove(tag)
 
-            return None
+        title = tree.findtext('.//title')
+        title_text = title.strip() if title else url
 
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {e}")
+        main = tree.xpath('//main|//article|//body')
+        if not main:
             return None
 
+        text = main[0].text_content()
+        text = '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+
+        return {
+            'url': url,
+            'title': title_text,
+            'content': text[:5000]  # Limit to first 5000 chars
+        }
+
+    def _extract_bs4(self, url: str, payload: bytes) -> Optional[Dict[str, str]]:
+        """BeautifulSoup fallback when lxml is unavailable."""
+        soup = BeautifulSoup(payload, 'html.parser')
+
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "footer"]):
+            script.decompose()
+
+        # Get title
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else url
+
+        # Get main content
+        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+
+        if main_content:
+            # Extract text
+            text = main_content.get_text(separator='\n', strip=True)
+            # Clean up excessive whitespace
+            text = '\n'.join([line.strip() for line in text.split('\n') if line.strip()])
+
+            return {
+                'url': url,
+                'title': title_text,
+                'content': text[:5000]  # Limit to first 5000 chars
+            }
+
+        return None
+
     def search_site(self, query: str) -> List[Dict[str, str]]:
         """
         Search the site for relevant pages
@@ -74,6 +168,14 @@ class WebScraperService:
         Returns:
             List of scraped content from relevant pages
         """
+        cache_key = query.lower().strip()
+        now = monotonic()
+        with self._search_cache_lock:
+            entry = self._search_cache.get(cache_key)
+            if entry and now - entry[0] < self._search_cache_ttl:
+                self._search_cache.move_to_end(cache_key)
+                return entry[1]
+
         results = []
 
         # Common pages to check
@@ -86,12 +188,21 @@ class WebScraperService:
             f"{self.base_url}/wealth-management",
         ]
 
-        for page_url in common_pages:
-            content = self.scrape_page(page_url)
+        # Fetch all candidates concurrently, then filter for relevance in
+        # submission order so ranking stays deterministic
+        for content in self._fetch_pool.map(self.scrape_page, common_pages):
             if content and self._is_relevant(content['content'], query):
                 results.append(content)
 
-        return results[:3]  # Return top 3 results
+        results = results[:3]  # Return top 3 results
+
+        with self._search_cache_lock:
+            self._search_cache[cache_key] = (now, results)
+            self._search_cache.move_to_end(cache_key)
+            while len(self._search_cache) > self._search_cache_max:
+                self._search_cache.popitem(last=False)
+
+        return results
 
     def _is_relevant(self, content: str, query: str) -> bool:
         """
@@ -104,18 +215,20 @@ class WebScraperService:
         Returns:
             True if content seems relevant
         """
-        query_lower = query.lower()
-        content_lower = content.lower()
+        query_words = [w for w in query.lower().split() if len(w) > 3]
+        if not query_words:
+            return False
 
-        # Split query into words
-        query_words = [w for w in query_lower.split() if len(w) > 3]
+        content_lower = content.lower()
 
-        # Check if at least one query word appears in content
-        for word in query_words:
-            if word in content_lower:
-                return True
+        # Few tokens: str.__contains__ (two-way search in C) wins
+        if len(query_words) < 4:
+            return any(word in content_lower for word in query_words)
 
-        return False
+        # Many tokens: one linear alternation scan over the page instead
+        # of a full pass per word; first hit short-circuits
+        pattern = re.compile("|".join(map(re.escape, dict.fromkeys(query_words))))
+        return pattern.search(content_lower) is not None
 
 
 # Global instance
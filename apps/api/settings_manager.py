@@ -2,9 +2,12 @@
 Settings manager for chatbot configuration.
 Stores settings in SQLite for easy runtime updates.
 """
-import json
+import orjson
 from datetime import datetime
+from threading import Lock
+from time import monotonic
 from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
@@ -25,6 +28,26 @@ class ChatSettings(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+def _serialize_value(value) -> str:
+    """Encode a setting value into its stored string form."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return str(value)
+
+
+def _parse_value(setting_type: str, raw: str):
+    """Decode a stored setting string into its declared type."""
+    if setting_type == "boolean":
+        return raw.lower() == "true"
+    if setting_type == "number":
+        return float(raw)
+    if setting_type == "json":
+        return orjson.loads(raw)
+    return raw
+
+
 class SettingsManager:
     """Manages chatbot settings with database persistence."""
 
@@ -138,76 +161,129 @@ TONE:
         },
     }
 
+    # Parsed-settings cache shared by every instance (SettingsManager is
+    # constructed per request around a request-scoped session). One bulk
+    # SELECT fills it; a short TTL lets other workers' writes converge.
+    _CACHE_TTL = 30.0
+    _cache = None
+    _cache_loaded_at = 0.0
+    _cache_lock = Lock()
+
     def __init__(self, db: Session):
         self.db = db
 
-    def get_setting(self, key: str, default=None):
-        """Get a setting value by key."""
-        try:
-            setting = self.db.query(ChatSettings).filter(
-                ChatSettings.setting_key == key
-            ).first()
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop the shared settings cache (next read reloads)."""
+        with cls._cache_lock:
+            cls._cache = None
 
-            if not setting:
-                # Return default from DEFAULT_SETTINGS
-                if key in self.DEFAULT_SETTINGS:
-                    return self.DEFAULT_SETTINGS[key]["value"]
-                return default
+    def _cached_settings(self):
+        """Return the shared {key: parsed_value} map, loading if stale."""
+        cls = SettingsManager
+        now = monotonic()
+        with cls._cache_lock:
+            if cls._cache is not None and now - cls._cache_loaded_at < cls._CACHE_TTL:
+                return cls._cache
 
-            # Parse value based on type
-            if setting.setting_type == "boolean":
-                return setting.setting_value.lower() == "true"
-            elif setting.setting_type == "number":
-                return float(setting.setting_value)
-            elif setting.setting_type == "json":
-                return json.loads(setting.setting_value)
-            else:
-                return setting.setting_value
+        try:
+            rows = self.db.query(
+                ChatSettings.setting_key,
+                ChatSettings.setting_value,
+                ChatSettings.setting_type,
+            ).all()
         except Exception as e:
-            print(f"⚠ Settings query error for '{key}': {e}")
-            self.db.rollback()  # Rollback failed transaction
-            # Return default
+            print(f"⚠ Settings cache load error: {e}")
+            self.db.rollback()
+            return None
+
+        cache = {key: _parse_value(t, raw) for key, raw, t in rows}
+        with cls._cache_lock:
+            cls._cache = cache
+            cls._cache_loaded_at = now
+        return cache
+
+    def get_setting(self, key: str, default=None):
+        """Get a setting value by key (served from the shared cache)."""
+        cache = self._cached_settings()
+        if cache is None:
+            # Cache load failed — fall back to defaults
             if key in self.DEFAULT_SETTINGS:
                 return self.DEFAULT_SETTINGS[key]["value"]
             return default
 
+        if key in cache:
+            return cache[key]
+        if key in self.DEFAULT_SETTINGS:
+            return self.DEFAULT_SETTINGS[key]["value"]
+        return default
+
     def set_setting(self, key: str, value, setting_type: str = None, description: str = None):
-        """Set a setting value."""
-        setting = self.db.query(ChatSettings).filter(
-            ChatSettings.setting_key == key
-        ).first()
-
-        # Convert value to string for storage
-        if isinstance(value, bool):
-            str_value = "true" if value else "false"
-            setting_type = setting_type or "boolean"
-        elif isinstance(value, (int, float)):
-            str_value = str(value)
-            setting_type = setting_type or "number"
-        elif isinstance(value, (dict, list)):
-            str_value = json.dumps(value)
-            setting_type = setting_type or "json"
-        else:
-            str_value = str(value)
-            setting_type = setting_type or "string"
-
-        if setting:
-            setting.setting_value = str_value
-            setting.setting_type = setting_type
-            if description:
-                setting.description = description
-            setting.updated_at = datetime.utcnow()
+        """Set a setting value with a single dialect-native upsert."""
+        # Infer storage type, then convert value to string
+        if setting_type is None:
+            if isinstance(value, bool):
+                setting_type = "boolean"
+            elif isinstance(value, (int, float)):
+                setting_type = "number"
+            elif isinstance(value, (dict, list)):
+                setting_type = "json"
+            else:
+                setting_type = "string"
+        str_value = _serialize_value(value)
+
+        # Built with literal values each call: SQLAlchemy turns them into
+        # bound parameters and the compiled form is shared through the
+        # engine's SQL compilation cache, so the statement is still only
+        # compiled once per dialect.
+        if self.db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
         else:
-            setting = ChatSettings(
-                setting_key=key,
-                setting_value=str_value,
-                setting_type=setting_type,
-                description=description or self.DEFAULT_SETTINGS.get(key, {}).get("description", "")
-            )
-            self.db.add(setting)
-
+            from sqlalchemy.dialects.sqlite import insert
+
+        ins = insert(ChatSettings).values(
+            setting_key=key,
+            setting_value=str_value,
+            setting_type=setting_type,
+            description=description or self.DEFAULT_SETTINGS.get(key, {}).get("description"),
+        )
+        stmt = ins.on_conflict_do_update(
+            index_elements=["setting_key"],
+            set_={
+                "setting_value": ins.excluded.setting_value,
+                "setting_type": ins.excluded.setting_type,
+                # Keep the stored description when the caller passes none
+                "description": func.coalesce(ins.excluded.description, ChatSettings.description),
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        self.db.execute(stmt)
         self.db.commit()
-        return setting
+
+        # Keep the shared cache coherent with the write
+        with SettingsManager._cache_lock:
+            if SettingsManager._cache is not None:
+                SettingsManager._cache[key] = _parse_value(setting_type, str_value)
+
+        # Transient instance for callers that echo the parsed type back —
+        # skips the post-commit SELECT the old read-modify-write path needed
+        return ChatSettings(
+            setting_key=key,
+            setting_value=str_value,
+            setting_type=setting_type,
+            description=description,
+        )
+
+    def get_settings_bulk(self, keys: list) -> dict:
+        """Get several raw setting values with a single SELECT ... IN query."""
+        from sqlalchemy import select
+
+        rows = self.db.execute(
+            select(ChatSettings.setting_key, ChatSettings.setting_value).where(
+                ChatSettings.setting_key.in_(keys)
+            )
+        ).all()
+        return dict(rows)
 
     def get_all_settings(self):
         """Get all settings as a dictionary."""
@@ -230,7 +306,7 @@ TONE:
             elif setting.setting_type == "number":
                 value = float(value)
             elif setting.setting_type == "json":
-                value = json.loads(value)
+                value = orjson.loads(value)
 
             settings[setting.setting_key] = {
                 "value": value,
@@ -240,36 +316,61 @@ TONE:
 
         return settings
 
+    def _bulk_write_defaults(self, overwrite: bool):
+        """Write DEFAULT_SETTINGS with one multi-row upsert and one commit.
+
+        A per-key set_setting loop costs a SELECT plus an INSERT/UPDATE
+        plus an fsync for each of the ~19 defaults; a single statement
+        makes it one round-trip and one fsync.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        rows = [
+            {
+                "setting_key": key,
+                "setting_value": _serialize_value(config["value"]),
+                "setting_type": config["type"],
+                "description": config["description"],
+            }
+            for key, config in self.DEFAULT_SETTINGS.items()
+        ]
+        ins = insert(ChatSettings).values(rows)
+        if overwrite:
+            stmt = ins.on_conflict_do_update(
+                index_elements=["setting_key"],
+                set_={
+                    "setting_value": ins.excluded.setting_value,
+                    "setting_type": ins.excluded.setting_type,
+                    "description": ins.excluded.description,
+                    "updated_at": datetime.utcnow(),
+                },
+            )
+        else:
+            # Don't clobber settings an admin has already changed
+            stmt = ins.on_conflict_do_nothing(index_elements=["setting_key"])
+
+        self.db.execute(stmt)
+        self.db.commit()
+        SettingsManager.invalidate_cache()
+
     def initialize_defaults(self):
         """Initialize default settings if they don't exist."""
-        for key, config in self.DEFAULT_SETTINGS.items():
-            existing = self.db.query(ChatSettings).filter(
-                ChatSettings.setting_key == key
-            ).first()
-
-            if not existing:
-                self.set_setting(
-                    key,
-                    config["value"],
-                    config["type"],
-                    config["description"]
-                )
+        self._bulk_write_defaults(overwrite=False)
 
     def reset_to_defaults(self):
         """Reset all settings to defaults."""
-        for key, config in self.DEFAULT_SETTINGS.items():
-            self.set_setting(
-                key,
-                config["value"],
-                config["type"],
-                config["description"]
-            )
+        self._bulk_write_defaults(overwrite=True)
 
 
 # Initialize settings table
 def init_settings_table(database_url: str):
     """Initialize the settings table."""
-    engine = create_engine(database_url, connect_args={"check_same_thread": False} if "sqlite" in database_url else {})
+    from db_factory import make_engine
+
+    engine = make_engine(database_url, one_shot=True)
     Base.metadata.create_all(bind=engine)
 
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -281,3 +382,25 @@ def init_settings_table(database_url: str):
         print("✓ Settings initialized")
     finally:
         db.close()
+
+
+if __name__ == "__main__":
+    # Smoke test: a settings write/read round-trip against in-memory
+    # SQLite — initialize_defaults alone doesn't exercise set_setting
+    from sqlalchemy import create_engine as _create_engine
+
+    _engine = _create_engine("sqlite://")
+    Base.metadata.create_all(bind=_engine)
+    _db = sessionmaker(bind=_engine)()
+
+    _mgr = SettingsManager(_db)
+    _mgr.initialize_defaults()
+    _mgr.set_setting("temperature", 0.5)
+    SettingsManager.invalidate_cache()
+    assert _mgr.get_setting("temperature") == 0.5
+    _mgr.set_setting("enable_rag", False)
+    SettingsManager.invalidate_cache()
+    assert _mgr.get_setting("enable_rag") is False
+    _mgr.reset_to_defaults()
+    assert _mgr.get_setting("temperature") == 0.7
+    print("✓ settings_manager smoke test passed")
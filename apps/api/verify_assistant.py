@@ -0,0 +1,39 @@
+"""
+One-shot assistant verification.
+
+AssistantsProvider normally retrieves the configured assistant on every
+process start just to confirm the id exists — N HTTP round-trips under
+multiple workers for a fully static config. Run this script once after
+changing OPENAI_ASSISTANT_ID; on success, set OPENAI_ASSISTANT_VERIFIED=1
+in .env and workers will trust the id without the retrieve call.
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    assistant_id = os.getenv("OPENAI_ASSISTANT_ID", "")
+
+    if not api_key or not assistant_id:
+        print("ERROR: OPENAI_API_KEY and OPENAI_ASSISTANT_ID must be set")
+        sys.exit(1)
+
+    from openai import OpenAI
+
+    try:
+        assistant = OpenAI(api_key=api_key).beta.assistants.retrieve(assistant_id)
+    except Exception as e:
+        print(f"❌ Could not retrieve assistant {assistant_id}: {e}")
+        sys.exit(1)
+
+    print(f"✓ Assistant verified: {assistant.id} ({getattr(assistant, 'name', '')})")
+    print("  Add to .env: OPENAI_ASSISTANT_VERIFIED=1")
+
+
+if __name__ == "__main__":
+    main()
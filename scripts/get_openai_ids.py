@@ -8,6 +8,7 @@ Usage:
 """
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 
 def main():
@@ -25,10 +26,16 @@ def main():
     print("🔍 FINDING YOUR OPENAI RESOURCES")
     print("=" * 60)
 
+    # Both list calls are independent I/O — overlap them so the wall
+    # time is the slower call, not the sum
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        vector_stores_future = pool.submit(client.beta.vector_stores.list)
+        assistants_future = pool.submit(client.beta.assistants.list)
+
     # List Vector Stores
     print("\n📦 Vector Stores:")
     try:
-        vector_stores = client.beta.vector_stores.list()
+        vector_stores = vector_stores_future.result()
         if vector_stores.data:
             for vs in vector_stores.data:
                 print(f"\n  Name: {vs.name}")
@@ -48,7 +55,7 @@ def main():
     # List Assistants
     print("\n\n🤖 Assistants:")
     try:
-        assistants = client.beta.assistants.list()
+        assistants = assistants_future.result()
         if assistants.data:
             for asst in assistants.data:
                 print(f"\n  Name: {asst.name}")
@@ -4,7 +4,10 @@ Reads markdown files from data/import and ingests them into the database.
 """
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -14,11 +17,10 @@ API_URL = os.getenv("API_URL", "http://localhost:8000")
 IMPORT_DIR = Path(__file__).parent.parent / "data" / "import"
 
 
-def ingest_file(file_path: Path):
+def ingest_file(session: requests.Session, file_path: Path):
     """Ingest a single markdown file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = file_path.read_text(encoding='utf-8')
 
         # Extract title from filename or first line
         title = file_path.stem.replace('-', ' ').replace('_', ' ').title()
@@ -35,7 +37,7 @@ def ingest_file(file_path: Path):
                 pass
 
         # Send to API
-        response = requests.post(
+        response = session.post(
             f"{API_URL}/admin/ingest",
             json={
                 "title": title,
@@ -81,13 +83,16 @@ def main():
 
     print(f"Found {len(md_files)} markdown file(s)\n")
 
-    # Ingest each file
-    doc_ids = []
-    for md_file in md_files:
-        doc_id = ingest_file(md_file)
-        if doc_id:
-            doc_ids.append(doc_id)
-        print()
+    # Overlap uploads: each POST blocks on the server's chunk+embed
+    # pipeline, so a handful of in-flight requests keeps both ends busy
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = pool.map(lambda md_file: ingest_file(session, md_file), md_files)
+    doc_ids = [doc_id for doc_id in results if doc_id]
 
     print(f"\n✅ Ingestion complete!")
     print(f"   Processed: {len(md_files)} files")
@@ -5,53 +5,378 @@ Run this after deploying to Render.
 Usage:
     python scripts/seed_production.py https://clarity-api.onrender.com
 """
+import gzip
+import hashlib
+import json
 import os
+import random
 import sys
-import requests
 import time
+import requests
 from pathlib import Path
 
-def ingest_file(api_url: str, file_path: Path):
-    """Ingest a single markdown file."""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Lock
+from requests.adapters import HTTPAdapter
+
+try:
+    # orjson encodes straight to bytes in C — markedly faster than
+    # stdlib json for megabyte-sized content strings
+    import orjson
+
+    def _json_body(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json(response):
+        # Decode straight from the raw bytes — Response.json() pays for
+        # an intermediate str of the whole body first
+        return orjson.loads(response.content)
+except ImportError:
+    def _json_body(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _json(response):
+        return json.loads(response.content)
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Local record of what previous runs uploaded: {path: [mtime, sha256, doc_id]}.
+# An unchanged (mtime, hash) entry skips the HTTP call outright.
+SEED_CACHE_PATH = Path(__file__).parent / ".seed-cache.json"
+
+
+def load_seed_cache() -> dict:
+    try:
+        return json.loads(SEED_CACHE_PATH.read_text())
+    except Exception:
+        return {}
+
+
+def save_seed_cache(cache: dict):
+    try:
+        SEED_CACHE_PATH.write_text(json.dumps(cache, indent=2))
+    except Exception as e:
+        print(f"⚠ Could not write seed cache: {e}")
+
+
+# Append-only checkpoint of this seeding pass: one JSON line per
+# successful upload ({"path", "doc_id"}) or approval ({"approved"}),
+# flushed as it happens. A crashed run resumes from here instead of
+# redoing finished work; a fully successful run deletes it.
+PROGRESS_PATH = Path(__file__).parent / ".seed-progress.jsonl"
+_progress_lock = Lock()
+
+
+def load_progress():
+    """Read the checkpoint into ({path: doc_id}, {approved ids})."""
+    ingested, approved = {}, set()
+    try:
+        with open(PROGRESS_PATH) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "path" in record:
+                    ingested[record["path"]] = record["doc_id"]
+                elif "approved" in record:
+                    approved.add(record["approved"])
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠ Ignoring unreadable checkpoint: {e}")
+    return ingested, approved
+
+
+def record_progress(ckpt, record: dict):
+    with _progress_lock:
+        ckpt.write(json.dumps(record) + "\n")
+        ckpt.flush()
+
+
+# Cross-run probe cache keyed by api_url: a run moments after another
+# can skip the health round-trip entirely and reuse the capabilities
+# manifest, which only changes on deploys.
+STATE_PATH = Path.home() / ".clarity-seed" / "state.json"
+HEALTH_TTL = 30.0
+CAPS_TTL = 300.0
+
+
+def load_probe_state() -> dict:
+    try:
+        return json.loads(STATE_PATH.read_text())
+    except Exception:
+        return {}
+
+
+def save_probe_state(state: dict):
+    try:
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        STATE_PATH.write_text(json.dumps(state, indent=2))
+    except Exception as e:
+        print(f"⚠ Could not write probe state: {e}")
+
+
+# Status codes worth retrying: rate limiting and the gateway errors a
+# cold-started Render instance throws while it spins up
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+def _pace_from_headers(response):
+    """Sleep only when the server says capacity is nearly exhausted.
+
+    Standard X-RateLimit-* headers drive the pacing: under 10% of the
+    window left, wait out the reset; otherwise proceed immediately. An
+    idle API never delays us.
+    """
+    try:
+        remaining = int(response.headers["X-RateLimit-Remaining"])
+        limit = int(response.headers["X-RateLimit-Limit"])
+    except (KeyError, ValueError):
+        return
+    if limit <= 0 or remaining / limit >= 0.1:
+        return
+    try:
+        delay = float(response.headers["X-RateLimit-Reset"]) - time.time()
+    except (KeyError, ValueError):
+        return
+    if delay > 0:
+        time.sleep(min(delay, 30.0))
+
+
+def retrying(send, max_attempts: int = 3, base: float = 1.0,
+             cap: float = 30.0, jitter: float = 0.5):
+    """Call ``send()`` with exponential backoff + jitter on transient failures.
+
+    ``send`` is a zero-argument callable returning a Response, invoked
+    fresh each attempt so streamed request bodies can be rebuilt. Honors
+    Retry-After on 429s; jitter spreads the concurrent workers out so
+    retries don't re-stampede the endpoint. Returns the last response,
+    or raises the last connection error once attempts run out.
+    """
+    for attempt in range(max_attempts):
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(min(cap, base * 2 ** attempt) * (1 + random.random() * jitter))
+            continue
+
+        if response.status_code not in RETRYABLE_STATUSES or attempt == max_attempts - 1:
+            _pace_from_headers(response)
+            return response
+
+        retry_after = response.headers.get("Retry-After")
+        if response.status_code == 429 and retry_after:
+            try:
+                delay = min(cap, float(retry_after))
+            except ValueError:
+                delay = min(cap, base * 2 ** attempt) * (1 + random.random() * jitter)
+        else:
+            delay = min(cap, base * 2 ** attempt) * (1 + random.random() * jitter)
+        time.sleep(delay)
+
+    return response
+
+
+def post_with_retry(session: requests.Session, url: str, **kw):
+    """POST with the standard retry policy."""
+    return retrying(lambda: session.post(url, **kw))
+
+
+class AIMDGate:
+    """Additive-increase / multiplicative-decrease concurrency gate.
+
+    A fixed worker count either under-drives or overloads the ingest
+    endpoint depending on how beefy the server is that day. The gate
+    starts narrow, widens by 0.5 after each healthy request, and halves
+    on any failure or when mean latency over the last window exceeds the
+    target — converging on the server's actual stable throughput.
+    """
+
+    def __init__(self, initial: float = 2.0, maximum: float = 8.0,
+                 latency_target: float = 5.0, window: int = 8,
+                 increase: float = 0.5, decrease: float = 0.5):
+        self._limit = float(initial)
+        self._max = maximum
+        self._latency_target = latency_target
+        self._latencies = deque(maxlen=window)
+        self._increase = increase
+        self._decrease = decrease
+        self._in_flight = 0
+        self._cond = Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, error: bool = False):
+        with self._cond:
+            self._in_flight -= 1
+            backoff = error
+            if not error:
+                self._latencies.append(latency)
+                full = len(self._latencies) == self._latencies.maxlen
+                if full and sum(self._latencies) / len(self._latencies) > self._latency_target:
+                    backoff = True
+            if backoff:
+                self._latencies.clear()
+                self._limit = max(1.0, self._limit * self._decrease)
+            else:
+                self._limit = min(self._max, self._limit + self._increase)
+            self._cond.notify_all()
+
+
+def fetch_capabilities(session: requests.Session, api_url: str) -> dict:
+    """Probe the server's ingest features once at startup.
+
+    Returns {} for older servers without the endpoint, which makes
+    every capability default falsy and keeps the legacy paths in play.
+    """
+    try:
+        response = session.get(f"{api_url}/admin/ingest/capabilities", timeout=10)
+        if response.status_code == 200:
+            return _json(response)
+    except Exception:
+        pass
+    return {}
+
+
+def gated_ingest(gate: AIMDGate, session: requests.Session, api_url: str,
+                 file_path: Path, cache: dict, caps: dict):
+    """Run one ingest under the gate, feeding back latency and outcome."""
+    gate.acquire()
+    start = time.monotonic()
+    doc_id = None
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        doc_id = ingest_file(session, api_url, file_path, cache, caps)
+    finally:
+        gate.release(time.monotonic() - start, error=doc_id is None)
+    return doc_id
 
-        # Extract title from filename
+
+def ingest_file(session: requests.Session, api_url: str, file_path: Path,
+                cache: dict, caps: dict):
+    """Ingest a single markdown file, skipping content already uploaded."""
+    try:
         title = file_path.stem.replace('-', ' ').replace('_', ' ').title()
 
-        # Send to API
-        print(f"📄 Ingesting: {title}...", end=" ")
-        response = requests.post(
-            f"{api_url}/admin/ingest",
-            json={
+        # Unchanged since the last run? Skip without even reading it.
+        key = str(file_path)
+        mtime = file_path.stat().st_mtime
+        entry = cache.get(key)
+        if entry and entry[0] == mtime:
+            print(f"📄 {title} ↷ unchanged, skipped")
+            return entry[2]
+
+        # Stream-hash in 64 KB blocks — content_hash lets the server
+        # skip re-chunking and re-embedding a document it already has
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+
+        if caps.get("multipart"):
+            fields = {
+                "title": title,
+                "source_url": f"file://{file_path.name}",
+                "source_type": "markdown",
+                "content_hash": content_hash,
+            }
+
+            # Multipart upload: the document travels as a file part
+            # instead of a JSON-escaped string, so a large file never
+            # needs an escaped in-memory copy. The body is rebuilt per
+            # attempt so retries never replay a half-consumed stream.
+            def send():
+                with open(file_path, 'rb') as fh:
+                    return session.post(
+                        f"{api_url}/admin/ingest-file",
+                        data=fields,
+                        files={"file": (file_path.name, fh, "text/markdown")},
+                        timeout=120
+                    )
+
+            response = retrying(send)
+        else:
+            # Legacy JSON endpoint for older servers
+            body = {
                 "title": title,
-                "content": content,
+                "content": file_path.read_text(encoding='utf-8'),
                 "source_url": f"file://{file_path.name}",
                 "source_type": "markdown",
                 "published_date": None,
-            },
-            timeout=60
-        )
+            }
+            if caps.get("hash_dedup"):
+                body["content_hash"] = content_hash
+            payload = _json_body(body)
+            headers = _JSON_HEADERS
+            # Markdown compresses 4-6x; worth the CPU once the body is
+            # big enough to notice on the wire
+            if caps.get("gzip") and len(payload) > 16384:
+                payload = gzip.compress(payload, compresslevel=4)
+                headers = {**_JSON_HEADERS, "Content-Encoding": "gzip"}
+            response = post_with_retry(
+                session,
+                f"{api_url}/admin/ingest",
+                data=payload,
+                headers=headers,
+                timeout=120
+            )
 
         if response.status_code == 200:
-            data = response.json()
-            print(f"✓ ({data['chunk_count']} chunks)")
+            data = _json(response)
+            print(f"📄 {title} ✓ ({data['chunk_count']} chunks)")
+            cache[key] = [mtime, content_hash, data['document_id']]
             return data['document_id']
         else:
-            print(f"✗ Failed: {response.status_code} - {response.text}")
+            print(f"📄 {title} ✗ Failed: {response.status_code} - {response.text}")
             return None
 
     except Exception as e:
-        print(f"✗ Error: {e}")
+        print(f"📄 {file_path.name} ✗ Error: {e}")
         return None
 
 
-def approve_document(api_url: str, doc_id: int):
+def approve_documents_bulk(session: requests.Session, api_url: str, ids: list):
+    """Approve every document in one request.
+
+    Returns the approved count, or None when the bulk endpoint is
+    missing (older deployed API) so the caller can fall back to per-id
+    calls.
+    """
+    try:
+        response = post_with_retry(
+            session,
+            f"{api_url}/admin/documents/approve-bulk",
+            data=_json_body({"ids": ids}),
+            headers=_JSON_HEADERS,
+            timeout=60
+        )
+    except Exception as e:
+        print(f"  Bulk approval error: {e}")
+        return None
+
+    if response.status_code == 404:
+        return None
+    if response.status_code == 200:
+        return _json(response).get("approved", 0)
+    print(f"  Bulk approval failed: {response.status_code} - {response.text}")
+    return 0
+
+
+def approve_document(session: requests.Session, api_url: str, doc_id: int):
     """Approve a document for retrieval."""
     try:
-        response = requests.post(
-            f"{api_url}/admin/documents/{doc_id}/approve",
+        response = post_with_retry(
+            session,
+            f"{api_url}/admin/approve/{doc_id}",
             timeout=30
         )
         return response.status_code == 200
@@ -74,22 +399,56 @@ def main():
     print("=" * 60)
     print(f"API URL: {api_url}\n")
 
-    # Check API health
-    print("🔍 Checking API health...", end=" ")
-    try:
-        response = requests.get(f"{api_url}/health", timeout=10)
-        if response.status_code == 200:
-            print("✓ API is healthy\n")
-        else:
-            print(f"✗ API returned {response.status_code}")
+    # One pooled session for the whole run: every request reuses the
+    # same TLS connection to the API instead of handshaking per call
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    session.headers["User-Agent"] = "clarity-seed/1"
+
+    state = load_probe_state()
+    probes = state.setdefault(api_url, {})
+
+    # Check API health — skipped when another run saw it healthy moments ago
+    if time.time() - probes.get("health_ok", 0) < HEALTH_TTL:
+        print("🔍 API healthy (recent probe)\n")
+    else:
+        print("🔍 Checking API health...", end=" ")
+        try:
+            response = session.get(f"{api_url}/health", timeout=10)
+            if response.status_code == 200:
+                print("✓ API is healthy\n")
+                probes["health_ok"] = time.time()
+            else:
+                print(f"✗ API returned {response.status_code}")
+                sys.exit(1)
+        except Exception as e:
+            print(f"✗ Cannot reach API: {e}")
             sys.exit(1)
-    except Exception as e:
-        print(f"✗ Cannot reach API: {e}")
-        sys.exit(1)
 
-    # Find markdown files
+    # One probe decides which paths to use for the whole run; the
+    # manifest only changes on deploys, so cached results stand in
+    if time.time() - probes.get("caps_at", 0) < CAPS_TTL and isinstance(probes.get("caps"), dict):
+        caps = probes["caps"]
+    else:
+        caps = fetch_capabilities(session, api_url)
+        probes["caps"] = caps
+        probes["caps_at"] = time.time()
+    save_probe_state(state)
+
+    # Find markdown files in one directory pass — scandir's cached
+    # dentry type avoids a stat per entry, and sorting keeps the
+    # ingestion order deterministic across runs
     import_dir = Path(__file__).parent.parent / "data" / "import"
-    md_files = list(import_dir.glob("*.md"))
+    try:
+        with os.scandir(import_dir) as it:
+            md_files = sorted(
+                (Path(entry.path) for entry in it
+                 if entry.name.endswith(".md") and entry.is_file(follow_symlinks=False)),
+                key=lambda p: p.name,
+            )
+    except FileNotFoundError:
+        md_files = []
 
     if not md_files:
         print("❌ No markdown files found in data/import/")
@@ -97,13 +456,32 @@ def main():
 
     print(f"📚 Found {len(md_files)} document(s) to ingest\n")
 
-    # Ingest files
-    doc_ids = []
-    for md_file in md_files:
-        doc_id = ingest_file(api_url, md_file)
+    # Ingest files concurrently: the server (embedding + DB) is the
+    # bottleneck, so overlapped uploads shrink wall time roughly
+    # linearly. The AIMD gate auto-tunes how many are actually in
+    # flight; the pool just supplies enough workers to hit its ceiling.
+    gate = AIMDGate()
+    seed_cache = load_seed_cache()
+
+    # Resume from the checkpoint of a previously interrupted run
+    ingested, already_approved = load_progress()
+    pending = [md_file for md_file in md_files if str(md_file) not in ingested]
+    if len(pending) < len(md_files):
+        print(f"↷ Resuming: {len(md_files) - len(pending)} file(s) already uploaded\n")
+
+    ckpt = open(PROGRESS_PATH, "a")
+
+    def run_one(md_file):
+        doc_id = gated_ingest(gate, session, api_url, md_file, seed_cache, caps)
         if doc_id:
-            doc_ids.append(doc_id)
-        time.sleep(1)  # Rate limiting
+            record_progress(ckpt, {"path": str(md_file), "doc_id": doc_id})
+        return doc_id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(run_one, pending))
+    doc_ids = [ingested[str(md_file)] for md_file in md_files if str(md_file) in ingested]
+    doc_ids += [doc_id for doc_id in results if doc_id]
+    save_seed_cache(seed_cache)
 
     print(f"\n{'=' * 60}")
     print(f"📋 Ingestion Summary")
@@ -121,21 +499,44 @@ def main():
     print(f"✅ Approving documents for retrieval")
     print(f"{'=' * 60}")
 
-    approved = 0
-    for doc_id in doc_ids:
-        print(f"Approving document {doc_id}...", end=" ")
-        if approve_document(api_url, doc_id):
-            print("✓")
-            approved += 1
+    # One bulk call approves everything in a single transaction; fall
+    # back to a per-id fan-out against an older API without the endpoint
+    to_approve = [doc_id for doc_id in doc_ids if doc_id not in already_approved]
+    if not to_approve:
+        approved = 0
+        print("All documents already approved (checkpoint)")
+    else:
+        approved = approve_documents_bulk(session, api_url, to_approve) if caps.get("bulk") else None
+        if approved is None:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                approvals = list(pool.map(
+                    lambda doc_id: approve_document(session, api_url, doc_id), to_approve
+                ))
+            approved = sum(approvals)
+            for doc_id, ok in zip(to_approve, approvals):
+                print(f"Document {doc_id}: {'✓' if ok else '✗'}")
+                if ok:
+                    record_progress(ckpt, {"approved": doc_id})
         else:
-            print("✗")
-        time.sleep(0.5)
+            print(f"Approved {approved} document(s) in one call")
+            for doc_id in to_approve:
+                record_progress(ckpt, {"approved": doc_id})
+
+    ckpt.close()
+    # Everything landed — the checkpoint has served its purpose
+    if len(doc_ids) == len(md_files) and approved == len(to_approve):
+        try:
+            PROGRESS_PATH.unlink()
+        except OSError:
+            pass
 
     print(f"\n{'=' * 60}")
     print(f"🎉 SEEDING COMPLETE!")
     print(f"{'=' * 60}")
-    print(f"✓ {approved}/{len(doc_ids)} documents approved and ready for RAG")
+    total_approved = approved + (len(doc_ids) - len(to_approve))
+    print(f"✓ {total_approved}/{len(doc_ids)} documents approved and ready for RAG")
     print(f"\nYour production database is now seeded! 🚀")
+    session.close()
 
 
 if __name__ == "__main__":
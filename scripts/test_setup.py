@@ -2,37 +2,63 @@
 Test script to verify the setup is working correctly.
 Run this after setup to ensure all components are functional.
 """
+import json
 import requests
-import time
 import sys
 
+from uuid import uuid4
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+
+    def _json(response):
+        # Decode straight from the raw bytes — Response.json() pays for
+        # an intermediate str of the whole body first
+        return orjson.loads(response.content)
+except ImportError:
+    def _json(response):
+        return json.loads(response.content)
+
 API_URL = "http://localhost:8000"
 WEB_URL = "http://localhost:3000"
 
+# Shared keep-alive session: the tests hammer the same two hosts, so one
+# pooled connection per host beats a fresh TCP handshake per request
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# The tests run concurrently, so each one collects its report lines and
+# returns them instead of printing mid-flight — output stays grouped per
+# test no matter how the checks interleave.
+
 def test_api_health():
     """Test API health endpoint."""
-    print("Testing API health endpoint...")
+    out = ["Testing API health endpoint..."]
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        response = session.get(f"{API_URL}/health", timeout=5)
         if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ API is healthy")
-            print(f"    - Dev mode: {data.get('dev_mode')}")
-            print(f"    - Database: {data.get('database')}")
-            return True
+            data = _json(response)
+            out.append(f"  ✓ API is healthy")
+            out.append(f"    - Dev mode: {data.get('dev_mode')}")
+            out.append(f"    - Database: {data.get('database')}")
+            return True, out
         else:
-            print(f"  ✗ API health check failed: {response.status_code}")
-            return False
+            out.append(f"  ✗ API health check failed: {response.status_code}")
+            return False, out
     except Exception as e:
-        print(f"  ✗ Cannot connect to API: {e}")
-        print(f"    Make sure backend is running: cd apps/api && uvicorn main:app --reload")
-        return False
+        out.append(f"  ✗ Cannot connect to API: {e}")
+        out.append(f"    Make sure backend is running: cd apps/api && uvicorn main:app --reload")
+        return False, out
 
 def test_chat_endpoint():
     """Test chat endpoint."""
-    print("\nTesting chat endpoint...")
+    out = ["Testing chat endpoint..."]
     try:
-        response = requests.post(
+        response = session.post(
             f"{API_URL}/chat",
             json={
                 "session_id": "test_session_123",
@@ -41,26 +67,29 @@ def test_chat_endpoint():
             timeout=10
         )
         if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ Chat endpoint working")
-            print(f"    - Response length: {len(data.get('response', ''))}")
-            print(f"    - Citations: {len(data.get('citations', []))}")
-            return True
+            data = _json(response)
+            out.append(f"  ✓ Chat endpoint working")
+            out.append(f"    - Response length: {len(data.get('response', ''))}")
+            out.append(f"    - Citations: {len(data.get('citations', []))}")
+            return True, out
         else:
-            print(f"  ✗ Chat endpoint failed: {response.status_code}")
-            return False
+            out.append(f"  ✗ Chat endpoint failed: {response.status_code}")
+            return False, out
     except Exception as e:
-        print(f"  ✗ Chat endpoint error: {e}")
-        return False
+        out.append(f"  ✗ Chat endpoint error: {e}")
+        return False, out
 
 def test_lead_gate():
     """Test lead gate functionality."""
-    print("\nTesting lead gate...")
+    out = ["Testing lead gate..."]
     try:
         # First message
-        session_id = f"test_session_{int(time.time())}"
+        # Unique per check: the tests run concurrently, and a shared
+        # timestamp-derived id would collide across checks started in
+        # the same second
+        session_id = f"test_session_{uuid4().hex}"
 
-        response1 = requests.post(
+        response1 = session.post(
             f"{API_URL}/chat",
             json={
                 "session_id": session_id,
@@ -70,11 +99,11 @@ def test_lead_gate():
         )
 
         if response1.status_code != 200:
-            print(f"  ✗ First message failed")
-            return False
+            out.append(f"  ✗ First message failed")
+            return False, out
 
         # Second message should trigger lead gate
-        response2 = requests.post(
+        response2 = session.post(
             f"{API_URL}/chat",
             json={
                 "session_id": session_id,
@@ -84,29 +113,30 @@ def test_lead_gate():
         )
 
         if response2.status_code == 200:
-            data = response2.json()
+            data = _json(response2)
             if data.get('show_lead_gate'):
-                print(f"  ✓ Lead gate triggered correctly")
-                return True
+                out.append(f"  ✓ Lead gate triggered correctly")
+                return True, out
             else:
-                print(f"  ✗ Lead gate not triggered")
-                return False
+                out.append(f"  ✗ Lead gate not triggered")
+                return False, out
         else:
-            print(f"  ✗ Second message failed")
-            return False
+            out.append(f"  ✗ Second message failed")
+            return False, out
 
     except Exception as e:
-        print(f"  ✗ Lead gate test error: {e}")
-        return False
+        out.append(f"  ✗ Lead gate test error: {e}")
+        return False, out
 
 def test_lead_creation():
     """Test lead creation."""
-    print("\nTesting lead creation...")
+    out = ["Testing lead creation..."]
     try:
-        session_id = f"test_session_{int(time.time())}"
+        # Unique per check, same as test_lead_gate
+        session_id = f"test_session_{uuid4().hex}"
 
         # Send first message to create conversation
-        requests.post(
+        session.post(
             f"{API_URL}/chat",
             json={
                 "session_id": session_id,
@@ -116,7 +146,7 @@ def test_lead_creation():
         )
 
         # Create lead
-        response = requests.post(
+        response = session.post(
             f"{API_URL}/lead",
             json={
                 "session_id": session_id,
@@ -128,35 +158,35 @@ def test_lead_creation():
         )
 
         if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ Lead created successfully")
-            print(f"    - Bucket: {data.get('bucket')}")
-            print(f"    - Meeting type: {data.get('meeting_type')}")
-            print(f"    - Booking URL: {data.get('booking_url')}")
-            return True
+            data = _json(response)
+            out.append(f"  ✓ Lead created successfully")
+            out.append(f"    - Bucket: {data.get('bucket')}")
+            out.append(f"    - Meeting type: {data.get('meeting_type')}")
+            out.append(f"    - Booking URL: {data.get('booking_url')}")
+            return True, out
         else:
-            print(f"  ✗ Lead creation failed: {response.status_code}")
-            return False
+            out.append(f"  ✗ Lead creation failed: {response.status_code}")
+            return False, out
 
     except Exception as e:
-        print(f"  ✗ Lead creation error: {e}")
-        return False
+        out.append(f"  ✗ Lead creation error: {e}")
+        return False, out
 
 def test_frontend():
     """Test frontend is accessible."""
-    print("\nTesting frontend...")
+    out = ["Testing frontend..."]
     try:
-        response = requests.get(WEB_URL, timeout=5)
+        response = session.get(WEB_URL, timeout=5)
         if response.status_code == 200:
-            print(f"  ✓ Frontend is accessible")
-            return True
+            out.append(f"  ✓ Frontend is accessible")
+            return True, out
         else:
-            print(f"  ✗ Frontend returned {response.status_code}")
-            return False
+            out.append(f"  ✗ Frontend returned {response.status_code}")
+            return False, out
     except Exception as e:
-        print(f"  ✗ Cannot connect to frontend: {e}")
-        print(f"    Make sure frontend is running: cd apps/web && npm run dev")
-        return False
+        out.append(f"  ✗ Cannot connect to frontend: {e}")
+        out.append(f"    Make sure frontend is running: cd apps/web && npm run dev")
+        return False, out
 
 def main():
     """Run all tests."""
@@ -165,19 +195,27 @@ def main():
     print("=" * 50)
     print()
 
-    results = []
-
-    # Test backend
-    results.append(("API Health", test_api_health()))
-    results.append(("Chat Endpoint", test_chat_endpoint()))
-    results.append(("Lead Gate", test_lead_gate()))
-    results.append(("Lead Creation", test_lead_creation()))
+    # The checks are independent (test_lead_gate keeps its two ordered
+    # messages internal), so run them all at once — the suite finishes
+    # in the slowest check's time instead of the sum of all timeouts
+    checks = [
+        ("API Health", test_api_health),
+        ("Chat Endpoint", test_chat_endpoint),
+        ("Lead Gate", test_lead_gate),
+        ("Lead Creation", test_lead_creation),
+        ("Frontend", test_frontend),
+    ]
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        outcomes = list(pool.map(lambda check: check[1](), checks))
 
-    # Test frontend
-    results.append(("Frontend", test_frontend()))
+    results = []
+    for (name, _), (ok, lines) in zip(checks, outcomes):
+        print("\n".join(lines))
+        print()
+        results.append((name, ok))
 
     # Summary
-    print("\n" + "=" * 50)
+    print("=" * 50)
     print("Test Summary")
     print("=" * 50)
 